@@ -0,0 +1,44 @@
+"""add job_listing_bodies satellite table
+
+Revision ID: 006_add_job_listing_bodies
+Revises: 005_add_unsubscribe_token
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "006_add_job_listing_bodies"
+down_revision = "005_add_unsubscribe_token"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if "job_listing_bodies" not in inspector.get_table_names():
+        op.create_table(
+            "job_listing_bodies",
+            sa.Column(
+                "job_id",
+                sa.Integer(),
+                sa.ForeignKey("job_listings.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("description", sa.Text(), nullable=True),
+        )
+        # Copie des descriptions existantes ; job_listings.description reste
+        # la source de lecture pendant la transition.
+        op.execute(
+            "INSERT INTO job_listing_bodies (job_id, description) "
+            "SELECT id, description FROM job_listings WHERE description IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("job_listing_bodies")
@@ -0,0 +1,49 @@
+"""replace btree created_at indexes with BRIN on append-only tables
+
+Revision ID: 007_brin_created_at_indexes
+Revises: 006_add_job_listing_bodies
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "007_brin_created_at_indexes"
+down_revision = "006_add_job_listing_bodies"
+branch_labels = None
+depends_on = None
+
+_TABLES = {
+    "job_listings": ("ix_job_listings_created_at", "ix_job_listings_created_brin"),
+    "job_search_runs": ("ix_job_search_runs_created_at", "ix_job_search_runs_created_brin"),
+}
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        # BRIN est propre à Postgres ; SQLite garde ses index btree.
+        return
+
+    inspector = inspect(conn)
+    for table, (old_ix, new_ix) in _TABLES.items():
+        existing = {ix["name"] for ix in inspector.get_indexes(table)}
+        if new_ix not in existing:
+            op.execute(
+                f"CREATE INDEX {new_ix} ON {table} "
+                f"USING brin (created_at) WITH (pages_per_range = 32)"
+            )
+        if old_ix in existing:
+            op.drop_index(old_ix, table_name=table)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    for table, (old_ix, new_ix) in _TABLES.items():
+        op.drop_index(new_ix, table_name=table)
+        op.create_index(old_ix, table, ["created_at"])
@@ -0,0 +1,42 @@
+"""widen job_listings / user_jobs ids to BIGINT
+
+Revision ID: 008_bigint_job_ids
+Revises: 007_brin_created_at_indexes
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "008_bigint_job_ids"
+down_revision = "007_brin_created_at_indexes"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = [
+    ("job_listings", "id"),
+    ("job_listing_bodies", "job_id"),
+    ("user_jobs", "id"),
+    ("user_jobs", "job_id"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        # SQLite : INTEGER PRIMARY KEY est déjà un entier 64 bits.
+        return
+
+    for table, column in _COLUMNS:
+        op.alter_column(table, column, type_=sa.BigInteger())
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    for table, column in _COLUMNS:
+        op.alter_column(table, column, type_=sa.Integer())
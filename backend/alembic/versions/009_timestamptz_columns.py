@@ -0,0 +1,61 @@
+"""convert datetime columns to timestamptz
+
+Revision ID: 009_timestamptz_columns
+Revises: 008_bigint_job_ids
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "009_timestamptz_columns"
+down_revision = "008_bigint_job_ids"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = [
+    ("users", "created_at"),
+    ("password_reset_tokens", "expires_at"),
+    ("password_reset_tokens", "created_at"),
+    ("email_verification_tokens", "expires_at"),
+    ("email_verification_tokens", "created_at"),
+    ("cvs", "created_at"),
+    ("user_preferences", "last_search_at"),
+    ("user_preferences", "last_email_at"),
+    ("user_preferences", "created_at"),
+    ("user_preferences", "updated_at"),
+    ("job_listings", "created_at"),
+    ("user_jobs", "created_at"),
+    ("user_jobs", "viewed_at"),
+    ("user_jobs", "notified_at"),
+    ("job_search_runs", "created_at"),
+    ("user_analysis_cache", "updated_at"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        # SQLite ne distingue pas timestamp/timestamptz.
+        return
+
+    # Les valeurs existantes ont été écrites en UTC (datetime.now(timezone.utc)
+    # dont le tzinfo était retiré au bind) : réinterprétation sans conversion.
+    for table, column in _COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} "
+            f"TYPE timestamptz USING {column} AT TIME ZONE 'UTC'"
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    for table, column in _COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} "
+            f"TYPE timestamp USING {column} AT TIME ZONE 'UTC'"
+        )
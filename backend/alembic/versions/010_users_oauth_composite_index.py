@@ -0,0 +1,45 @@
+"""composite unique index on users (oauth_provider, oauth_id)
+
+Revision ID: 010_users_oauth_composite_index
+Revises: 009_timestamptz_columns
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "010_users_oauth_composite_index"
+down_revision = "009_timestamptz_columns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    existing = {ix["name"] for ix in inspector.get_indexes("users")}
+
+    if "ix_users_oauth_provider_id" not in existing:
+        op.create_index(
+            "ix_users_oauth_provider_id",
+            "users",
+            ["oauth_provider", "oauth_id"],
+            unique=True,
+            postgresql_where=sa.text("oauth_provider IS NOT NULL"),
+            sqlite_where=sa.text("oauth_provider IS NOT NULL"),
+        )
+
+    # Les deux index mono-colonne ne servent plus : le composite couvre le
+    # lookup (provider, id) et un filtre sur provider seul.
+    for old_ix in ("ix_users_oauth_provider", "ix_users_oauth_id"):
+        if old_ix in existing:
+            op.drop_index(old_ix, table_name="users")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_oauth_provider_id", table_name="users")
+    op.create_index("ix_users_oauth_provider", "users", ["oauth_provider"])
+    op.create_index("ix_users_oauth_id", "users", ["oauth_id"])
@@ -0,0 +1,33 @@
+"""composite index on job_listings (created_at, source)
+
+Revision ID: 011_joblisting_created_source_index
+Revises: 010_users_oauth_composite_index
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "011_joblisting_created_source_index"
+down_revision = "010_users_oauth_composite_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    existing = {ix["name"] for ix in inspector.get_indexes("job_listings")}
+
+    if "ix_joblisting_created_source" not in existing:
+        op.create_index(
+            "ix_joblisting_created_source",
+            "job_listings",
+            ["created_at", "source"],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_joblisting_created_source", table_name="job_listings")
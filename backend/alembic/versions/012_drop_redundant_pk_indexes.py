@@ -0,0 +1,48 @@
+"""drop redundant secondary indexes on primary key columns
+
+Revision ID: 012_drop_redundant_pk_indexes
+Revises: 011_joblisting_created_source_index
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "012_drop_redundant_pk_indexes"
+down_revision = "011_joblisting_created_source_index"
+branch_labels = None
+depends_on = None
+
+# (table, index) créés par l'ancien index=True sur des colonnes déjà
+# couvertes par l'index implicite de la PK — doublons purs.
+REDUNDANT = [
+    ("users", "ix_users_id"),
+    ("password_reset_tokens", "ix_password_reset_tokens_id"),
+    ("email_verification_tokens", "ix_email_verification_tokens_id"),
+    ("cvs", "ix_cvs_id"),
+    ("user_preferences", "ix_user_preferences_id"),
+    ("job_listings", "ix_job_listings_id"),
+    ("user_jobs", "ix_user_jobs_id"),
+    ("job_search_runs", "ix_job_search_runs_id"),
+    ("user_analysis_cache", "ix_user_analysis_cache_user_id"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+
+    for table, index in REDUNDANT:
+        if table not in tables:
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table)}
+        if index in existing:
+            op.drop_index(index, table_name=table)
+
+
+def downgrade() -> None:
+    # Recréer ces doublons n'a pas d'intérêt : no-op volontaire.
+    pass
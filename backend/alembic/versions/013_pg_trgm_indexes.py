@@ -0,0 +1,62 @@
+"""pg_trgm GIN indexes for ILIKE keyword search on job_listings
+
+Revision ID: 013_pg_trgm_indexes
+Revises: 012_drop_redundant_pk_indexes
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+from alembic import op
+from sqlalchemy import inspect, text
+
+
+# revision identifiers, used by Alembic.
+revision = "013_pg_trgm_indexes"
+down_revision = "012_drop_redundant_pk_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    # pg_trgm n'existe que sur Postgres ; SQLite (dev/test) n'a rien
+    # d'équivalent et ses volumes ne le justifient pas.
+    if conn.dialect.name != "postgresql":
+        return
+
+    op.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    inspector = inspect(conn)
+    existing = {ix["name"] for ix in inspector.get_indexes("job_listings")}
+
+    # Les filtres must/avoid_keywords font des ILIKE '%mot%' sur titre et
+    # description : sans trigramme c'est un seq scan par mot-clé.
+    if "ix_joblisting_title_trgm" not in existing:
+        op.execute(
+            text(
+                "CREATE INDEX ix_joblisting_title_trgm "
+                "ON job_listings USING gin (title gin_trgm_ops)"
+            )
+        )
+    if "ix_joblisting_company_trgm" not in existing:
+        op.execute(
+            text(
+                "CREATE INDEX ix_joblisting_company_trgm "
+                "ON job_listings USING gin (company gin_trgm_ops)"
+            )
+        )
+    if "ix_joblisting_description_trgm" not in existing:
+        op.execute(
+            text(
+                "CREATE INDEX ix_joblisting_description_trgm "
+                "ON job_listings USING gin (description gin_trgm_ops)"
+            )
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+    op.drop_index("ix_joblisting_description_trgm", table_name="job_listings")
+    op.drop_index("ix_joblisting_company_trgm", table_name="job_listings")
+    op.drop_index("ix_joblisting_title_trgm", table_name="job_listings")
@@ -0,0 +1,71 @@
+"""hashed unique key on job_listings.url
+
+Revision ID: 014_joblisting_url_hash
+Revises: 013_pg_trgm_indexes
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "014_joblisting_url_hash"
+down_revision = "013_pg_trgm_indexes"
+branch_labels = None
+depends_on = None
+
+BATCH = 1000
+
+
+def _hash(url: str) -> bytes:
+    # même empreinte que models.job_url_hash
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = {c["name"] for c in inspector.get_columns("job_listings")}
+
+    if "url_hash" not in columns:
+        op.add_column("job_listings", sa.Column("url_hash", sa.LargeBinary(16), nullable=True))
+
+    # Backfill en Python (blake2b n'existe pas côté serveur), par lots
+    rows = conn.execute(
+        sa.text("SELECT id, url FROM job_listings WHERE url_hash IS NULL")
+    ).all()
+    update = sa.text("UPDATE job_listings SET url_hash = :h WHERE id = :id")
+    for start in range(0, len(rows), BATCH):
+        conn.execute(
+            update,
+            [{"h": _hash(url), "id": job_id} for job_id, url in rows[start : start + BATCH]],
+        )
+
+    existing = {ix["name"] for ix in inspector.get_indexes("job_listings")}
+    if "ux_joblisting_url_hash" not in existing:
+        op.create_index("ux_joblisting_url_hash", "job_listings", ["url_hash"], unique=True)
+
+    if conn.dialect.name != "postgresql":
+        # SQLite (dev/test) : NOT NULL et la suppression de l'unicité sur url
+        # demanderaient de recréer la table ; le modèle fait foi.
+        return
+
+    op.alter_column("job_listings", "url_hash", nullable=False)
+
+    # L'unicité portait sur l'URL brute (contrainte ou index selon l'origine
+    # du schéma) : devenue redondante et coûteuse, on la retire.
+    for uc in inspector.get_unique_constraints("job_listings"):
+        if uc["column_names"] == ["url"]:
+            op.drop_constraint(uc["name"], "job_listings", type_="unique")
+    for ix in inspector.get_indexes("job_listings"):
+        if ix.get("unique") and ix["column_names"] == ["url"]:
+            op.drop_index(ix["name"], table_name="job_listings")
+
+
+def downgrade() -> None:
+    op.drop_index("ux_joblisting_url_hash", table_name="job_listings")
+    op.drop_column("job_listings", "url_hash")
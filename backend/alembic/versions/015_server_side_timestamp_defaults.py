@@ -0,0 +1,76 @@
+"""server-side now() defaults for created_at/updated_at columns
+
+Revision ID: 015_server_side_timestamp_defaults
+Revises: 014_joblisting_url_hash
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "015_server_side_timestamp_defaults"
+down_revision = "014_joblisting_url_hash"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ("users", "created_at"),
+    ("password_reset_tokens", "created_at"),
+    ("email_verification_tokens", "created_at"),
+    ("cvs", "created_at"),
+    ("user_preferences", "created_at"),
+    ("user_preferences", "updated_at"),
+    ("job_listings", "created_at"),
+    ("user_jobs", "created_at"),
+    ("job_search_runs", "created_at"),
+    ("user_analysis_cache", "updated_at"),
+]
+
+
+def _columns_by_table() -> dict:
+    grouped: dict = {}
+    for table, column in COLUMNS:
+        grouped.setdefault(table, []).append(column)
+    return grouped
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    # Les defaults étaient calculés côté Python et les modèles n'en posent
+    # plus : une base existante migrée en place doit recevoir le DEFAULT,
+    # sinon chaque INSERT échoue sur NOT NULL. Postgres supporte l'ALTER
+    # direct ; SQLite passe par batch_alter_table (recopie de la table).
+    if conn.dialect.name == "postgresql":
+        for table, column in COLUMNS:
+            op.alter_column(table, column, server_default=sa.text("now()"))
+        return
+
+    for table, columns in _columns_by_table().items():
+        with op.batch_alter_table(table) as batch:
+            for column in columns:
+                batch.alter_column(
+                    column,
+                    existing_type=sa.DateTime(timezone=True),
+                    existing_nullable=False,
+                    server_default=sa.text("CURRENT_TIMESTAMP"),
+                )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        for table, column in COLUMNS:
+            op.alter_column(table, column, server_default=None)
+        return
+
+    for table, columns in _columns_by_table().items():
+        with op.batch_alter_table(table) as batch:
+            for column in columns:
+                batch.alter_column(
+                    column,
+                    existing_type=sa.DateTime(timezone=True),
+                    existing_nullable=False,
+                    server_default=None,
+                )
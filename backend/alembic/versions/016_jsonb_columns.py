@@ -0,0 +1,50 @@
+"""convert JSON-in-Text columns to jsonb
+
+Revision ID: 016_jsonb_columns
+Revises: 015_server_side_timestamp_defaults
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision = "016_jsonb_columns"
+down_revision = "015_server_side_timestamp_defaults"
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ("job_search_runs", "tried_queries"),
+    ("job_search_runs", "sources"),
+    ("job_search_runs", "analysis_json"),
+    ("user_analysis_cache", "analysis_json"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    # jsonb n'existe que sur Postgres ; SQLite stocke le JSON générique en
+    # texte, rien à convertir.
+    if conn.dialect.name != "postgresql":
+        return
+
+    for table, column in COLUMNS:
+        op.execute(
+            text(
+                f"ALTER TABLE {table} ALTER COLUMN {column} "
+                f"TYPE jsonb USING {column}::jsonb"
+            )
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+
+    for table, column in COLUMNS:
+        op.execute(
+            text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE text USING {column}::text")
+        )
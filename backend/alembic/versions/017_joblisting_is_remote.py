@@ -0,0 +1,42 @@
+"""is_remote précalculé sur job_listings
+
+Revision ID: 017_joblisting_is_remote
+Revises: 016_jsonb_columns
+Create Date: 2025-02-20 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "017_joblisting_is_remote"
+down_revision = "016_jsonb_columns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = {col["name"] for col in inspector.get_columns("job_listings")}
+
+    if "is_remote" not in columns:
+        op.add_column("job_listings", sa.Column("is_remote", sa.Boolean(), nullable=True))
+
+    # Backfill : même dérivation que models.job_is_remote (location +
+    # description). Les lignes restantes à NULL sont redérivées à la
+    # lecture, donc pas besoin de NOT NULL.
+    conn.execute(
+        sa.text(
+            "UPDATE job_listings "
+            "SET is_remote = (lower(coalesce(location, '') || ' ' || coalesce(description, '')) "
+            "LIKE '%remote%') "
+            "WHERE is_remote IS NULL"
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("job_listings", "is_remote")
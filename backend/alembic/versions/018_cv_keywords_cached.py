@@ -0,0 +1,33 @@
+"""keywords_cached précalculé sur cvs
+
+Revision ID: 018_cv_keywords_cached
+Revises: 017_joblisting_is_remote
+Create Date: 2025-02-21 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "018_cv_keywords_cached"
+down_revision = "017_joblisting_is_remote"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = {col["name"] for col in inspector.get_columns("cvs")}
+
+    if "keywords_cached" not in columns:
+        op.add_column("cvs", sa.Column("keywords_cached", sa.Text(), nullable=True))
+
+    # Pas de backfill : la tokenisation vit en Python (cv_keywords), qui
+    # recalcule et remplit la colonne à la première lecture de chaque CV.
+
+
+def downgrade() -> None:
+    op.drop_column("cvs", "keywords_cached")
@@ -7,9 +7,9 @@ from collections import Counter
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
-from .models import CV, JobListing, UserPreference, JobSearchRun
+from .models import CV, JobListing, JobListingBody, UserPreference, JobSearchRun, job_is_remote, job_url_hash
 from .services.providers import (
     fetch_adzuna_jobs,
     fetch_francetravail_jobs,
@@ -1645,6 +1645,7 @@ def clean_field(value: Optional[str]) -> Optional[str]:
 def latest_cv(db: Session, user_id: int) -> Optional[CV]:
     return (
         db.query(CV)
+        .options(undefer(CV.text))
         .filter(CV.user_id == user_id)
         .order_by(CV.id.desc())
         .first()
@@ -2346,11 +2347,7 @@ def search_jobs_for_user(
         and pref_updated <= last_run.created_at
         and (not latest_cv_obj or latest_cv_obj.created_at <= last_run.created_at)
     ):
-        cached = None
-        try:
-            cached = json.loads(last_run.analysis_json) if last_run.analysis_json else None
-        except Exception:
-            cached = None
+        cached = last_run.analysis_json or None
         return {
             "inserted": 0,
             "tried_queries": [],
@@ -2433,10 +2430,11 @@ def search_jobs_for_user(
                 norm_url = normalize_url(job.get("url"))
                 if not norm_url:
                     continue
-                # 1. Vérifier d'abord par URL normalisée (match exact)
+                # 1. Vérifier d'abord par URL normalisée (match exact sur le
+                # hash : clé courte, index unique dédié)
                 existing = (
                     db.query(JobListing)
-                    .filter(JobListing.url == norm_url)
+                    .filter(JobListing.url_hash == job_url_hash(norm_url))
                     .first()
                 )
                 # 2. Sinon, vérifier par titre + entreprise pour détecter les doublons cross-plateforme
@@ -2454,7 +2452,11 @@ def search_jobs_for_user(
                     url=norm_url,  # Stocker l'URL normalisée pour éviter les doublons
                     description=job.get("description"),
                     salary_min=job.get("salary_min"),
+                    is_remote=job_is_remote(job.get("location"), job.get("description")),
                 )
+                # Double écriture transitoire : le corps part aussi dans la
+                # table satellite job_listing_bodies.
+                record.body = JobListingBody(description=job.get("description"))
                 db.add(record)
                 new_jobs.append(record)  # Collecter pour le dashboard
                 inserted += 1
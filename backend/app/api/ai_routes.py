@@ -1,4 +1,6 @@
 import logging
+import os
+from collections import OrderedDict
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
@@ -17,6 +19,64 @@ from app.services.matching import ensure_linkedin_sample
 
 router = APIRouter(tags=["ai"])
 
+# Cache borné des analyses déjà parsées, clé (user_id, updated_at).
+# updated_at sert de version implicite : toute mise à jour de la ligne
+# produit un cache miss naturel, aucune invalidation explicite à gérer.
+_ANALYSIS_CACHE: "OrderedDict[tuple[int, str], dict]" = OrderedDict()
+_ANALYSIS_CACHE_MAX = 1024
+
+# Second niveau optionnel dans Redis : partagé entre workers, survit aux
+# redémarrages, expiré par TTL. La clé embarque updated_at comme le cache
+# local, donc pas d'invalidation explicite. Le Postgres reste source de
+# vérité ; sans REDIS_URL tout passe par le cache mémoire + DB.
+_ANALYSIS_REDIS_TTL = 3600
+
+_redis = None
+_redis_url = os.getenv("REDIS_URL", "")
+if _redis_url:
+    try:
+        import redis
+
+        _redis = redis.Redis.from_url(_redis_url, decode_responses=True)
+    except Exception as exc:  # pragma: no cover - dépend de l'environnement
+        log.warning("Redis indisponible pour le cache d'analyses (%s)", exc)
+
+
+def _analysis_cache_get(user_id: int, updated_at) -> dict | None:
+    key = (user_id, str(updated_at))
+    cached = _ANALYSIS_CACHE.get(key)
+    if cached is not None:
+        _ANALYSIS_CACHE.move_to_end(key)
+        return cached
+    if _redis is not None:
+        try:
+            raw = _redis.get(f"analysis:{user_id}:{updated_at}")
+        except Exception as exc:
+            log.warning("Redis get failed for analysis cache: %s", exc)
+            raw = None
+        if raw:
+            cached = json.loads(raw)
+            _analysis_cache_put(user_id, updated_at, cached)
+            return cached
+    return None
+
+
+def _analysis_cache_put(user_id: int, updated_at, analysis: dict) -> None:
+    key = (user_id, str(updated_at))
+    _ANALYSIS_CACHE[key] = analysis
+    _ANALYSIS_CACHE.move_to_end(key)
+    while len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_MAX:
+        _ANALYSIS_CACHE.popitem(last=False)
+    if _redis is not None:
+        try:
+            _redis.set(
+                f"analysis:{user_id}:{updated_at}",
+                json.dumps(analysis),
+                ex=_ANALYSIS_REDIS_TTL,
+            )
+        except Exception as exc:
+            log.warning("Redis set failed for analysis cache: %s", exc)
+
 
 def _normalize_datetime(dt):
     """Normalise une datetime pour comparaison (enlève la timezone si présente)."""
@@ -35,34 +95,49 @@ def ai_analysis(
 ):
     pref = get_or_create_pref(user, db)
     cv_entry = latest_cv(db, user.id)
-    cache = db.query(UserAnalysisCache).filter(UserAnalysisCache.user_id == user.id).first()
+    # Ne lire que updated_at : le blob analysis_json n'est chargé qu'en cas
+    # de cache miss sur (user_id, updated_at).
+    cache_updated_raw = (
+        db.query(UserAnalysisCache.updated_at)
+        .filter(UserAnalysisCache.user_id == user.id)
+        .scalar()
+    )
 
     # Normaliser les dates pour éviter les problèmes de timezone
     pref_updated = _normalize_datetime(pref.updated_at or pref.created_at)
-    cache_updated = _normalize_datetime(cache.updated_at) if cache else None
+    cache_updated = _normalize_datetime(cache_updated_raw)
     cv_created = _normalize_datetime(cv_entry.created_at) if cv_entry else None
 
     # Utiliser le cache si valide
-    if not force and cache and cache_updated:
+    if not force and cache_updated:
         cache_is_valid = (
             pref_updated <= cache_updated and
             (cv_created is None or cv_created <= cache_updated)
         )
         if cache_is_valid:
+            cached = _analysis_cache_get(user.id, cache_updated_raw)
+            if cached is None:
+                cache = db.query(UserAnalysisCache).filter(UserAnalysisCache.user_id == user.id).first()
+                cached = (cache.analysis_json if cache else None) or {}
+            # Un blob vide ou d'un ancien schéma ne doit pas faire échouer
+            # l'endpoint : on retombe sur un recalcul, comme avant le cache.
             try:
-                cached = json.loads(cache.analysis_json) if cache.analysis_json else {}
-                return AnalysisOut(**cached)
+                out = AnalysisOut(**cached)
             except Exception as exc:
                 log.warning("Failed to parse cached analysis for user %d: %s", user.id, exc)
+            else:
+                _analysis_cache_put(user.id, cache_updated_raw, cached)
+                return out
 
     analysis = analyze_profile(db, user.id, pref)
     now = datetime.now(timezone.utc)
+    cache = db.query(UserAnalysisCache).filter(UserAnalysisCache.user_id == user.id).first()
     if cache:
-        cache.analysis_json = json.dumps(analysis)
+        cache.analysis_json = analysis
         cache.updated_at = now
         db.add(cache)
     else:
-        db.add(UserAnalysisCache(user_id=user.id, analysis_json=json.dumps(analysis), updated_at=now))
+        db.add(UserAnalysisCache(user_id=user.id, analysis_json=analysis, updated_at=now))
     db.commit()
     return AnalysisOut(**analysis)
 
@@ -79,10 +154,10 @@ def jobs_search(
     run_entry = JobSearchRun(
         user_id=user.id,
         inserted=result.get("inserted", 0),
-        tried_queries=json.dumps(result.get("tried_queries", [])),
-        sources=json.dumps(result.get("sources", {})),
+        tried_queries=result.get("tried_queries", []),
+        sources=result.get("sources", {}),
         created_at=datetime.now(timezone.utc),
-        analysis_json=json.dumps(result.get("analysis", {})),
+        analysis_json=result.get("analysis", {}),
     )
     try:
         db.add(run_entry)
@@ -91,11 +166,11 @@ def jobs_search(
         cache = db.query(UserAnalysisCache).filter(UserAnalysisCache.user_id == user.id).first()
         now = datetime.now(timezone.utc)
         if cache:
-            cache.analysis_json = json.dumps(result.get("analysis", {}))
+            cache.analysis_json = result.get("analysis", {})
             cache.updated_at = now
             db.add(cache)
         else:
-            db.add(UserAnalysisCache(user_id=user.id, analysis_json=json.dumps(result.get("analysis", {})), updated_at=now))
+            db.add(UserAnalysisCache(user_id=user.id, analysis_json=result.get("analysis", {}), updated_at=now))
         db.commit()
         # ne conserve que les 8 derniers runs pour l'utilisateur
         stale = (
@@ -133,14 +208,8 @@ def jobs_runs(
     )
     results = []
     for run in runs:
-        try:
-            tried = json.loads(run.tried_queries) if run.tried_queries else []
-        except Exception:
-            tried = []
-        try:
-            sources = json.loads(run.sources) if run.sources else {}
-        except Exception:
-            sources = {}
+        tried = run.tried_queries or []
+        sources = run.sources or {}
         created = run.created_at
         if created and created.tzinfo is None:
             created = created.replace(tzinfo=timezone.utc)
@@ -5,14 +5,14 @@ import time
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from pypdf import PdfReader
 
 from app.auth import get_current_user
 from app.deps import get_db
 from app.models import CV, User
 from app.schemas import CVOut
-from app.services.matching import clear_user_job_data
+from app.services.matching import _compute_cv_keywords, clear_user_job_data
 from app.services import storage
 
 router = APIRouter(prefix="/cv", tags=["cv"])
@@ -102,7 +102,13 @@ async def upload_cv(
             storage.delete_object(old.filename)
         db.delete(old)
 
-    cv = CV(user_id=user.id, filename=safe_name, text=text)
+    # Mots-clés calculés une fois ici plutôt qu'à chaque listing de matches
+    cv = CV(
+        user_id=user.id,
+        filename=safe_name,
+        text=text,
+        keywords_cached=",".join(sorted(_compute_cv_keywords(text))),
+    )
     db.add(cv)
     db.commit()
     db.refresh(cv)
@@ -119,6 +125,7 @@ def latest_cv(
 ):
     cv = (
         db.query(CV)
+        .options(undefer(CV.text))
         .filter(CV.user_id == user.id)
         .order_by(CV.id.desc())
         .first()
@@ -1,19 +1,22 @@
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import case, or_
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
 from app.auth import get_current_user
 from app.deps import get_db
 from app.models import User, JobListing, UserJob
-from app.schemas import JobOut, MatchesPage, UserJobUpdate, UserJobOut, UserJobsPage, DashboardStatsOut
+from app.schemas import MatchesPage, UserJobUpdate, UserJobOut, UserJobsPage, DashboardStatsOut
 from app.services.preferences import get_or_create_pref
 from app.services.matching import (
     cv_keywords,
     ensure_linkedin_sample,
     is_job_url_alive,
     _extract_match_reasons,
+    _job_search_text,
     _normalize_created_at,
 )
 
@@ -74,6 +77,7 @@ def matches(
     base_query = (
         db.query(UserJob, JobListing)
         .join(JobListing, UserJob.job_id == JobListing.id)
+        .options(undefer(JobListing.description))
         .filter(UserJob.user_id == user.id)
         .filter(UserJob.status != "deleted")
     )
@@ -137,39 +141,52 @@ def matches(
     start = max(0, (page - 1) * page_size)
     rows = base_query.offset(start).limit(page_size).all()
 
+    # Sérialisation directe en dicts + orjson : même avec model_construct,
+    # FastAPI re-valide et re-parcourt chaque JobOut contre response_model
+    # à l'encodage. Le response_model reste sur la route pour le schéma
+    # OpenAPI ; OPT_UTC_Z aligne le format des datetimes sur Pydantic.
     items = []
     for user_job, job in rows:
         created_at = _normalize_created_at(job.created_at)
         is_new = user_job.status == "new"
-        is_remote = "remote" in (job.location or "").lower() or "remote" in (job.description or "").lower()
+        is_remote = job.is_remote
+        if is_remote is None:  # lignes d'avant la colonne calculée
+            _, _, loc_l, desc_l = _job_search_text(job)
+            is_remote = "remote" in loc_l or "remote" in desc_l
         match_reasons = _extract_match_reasons(job, pref, user_cv)
         items.append(
-            JobOut(
-                id=job.id,
-                source=job.source,
-                title=job.title,
-                company=job.company,
-                location=job.location,
-                url=job.url,
-                description=job.description,
-                salary_min=job.salary_min,
-                score=user_job.score,
-                is_remote=is_remote,
-                is_new=is_new,
-                is_saved=user_job.status == "saved",
-                status=user_job.status,
-                created_at=created_at,
-                match_reasons=match_reasons,
-            )
+            {
+                "id": job.id,
+                "source": job.source,
+                "title": job.title,
+                "company": job.company,
+                "location": job.location,
+                "url": job.url,
+                "description": job.description,
+                "salary_min": job.salary_min,
+                "score": user_job.score,
+                "is_remote": is_remote,
+                "is_new": is_new,
+                "is_saved": user_job.status == "saved",
+                "status": user_job.status,
+                "created_at": created_at,
+                "match_reasons": match_reasons,
+            }
         )
 
-    return MatchesPage(
-        items=items,
-        total=total,
-        page=page,
-        page_size=page_size,
-        available_sources=available_sources,
-        new_count=new_count,
+    return Response(
+        content=orjson.dumps(
+            {
+                "items": items,
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "available_sources": available_sources,
+                "new_count": new_count,
+            },
+            option=orjson.OPT_UTC_Z,
+        ),
+        media_type="application/json",
     )
 
 
@@ -242,7 +259,7 @@ def mark_visit(
 
     # Vérification URL optionnelle
     if check_url:
-        job = db.query(JobListing).filter(JobListing.id == job_id).first()
+        job = db.get(JobListing, job_id)
         if job and not is_job_url_alive(job.url):
             user_job.status = "deleted"
             db.commit()
@@ -24,7 +24,9 @@ def get_current_user(
             detail="Invalid token",
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Session.get : lookup par PK via l'identity map + requête pré-compilée,
+    # pas de Query à reconstruire à chaque appel authentifié.
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
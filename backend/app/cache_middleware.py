@@ -0,0 +1,174 @@
+"""
+Cache de réponses à courte durée de vie pour les endpoints GET chauds.
+
+/matches et /dashboard/stats sont pollés par le frontend et recalculent
+une page Pydantic complète à chaque requête. Les octets sérialisés sont
+mis en cache quelques secondes par (utilisateur, chemin, query string) :
+une répétition identique est servie directement depuis la mémoire sans
+repasser par le handler ni les sérialiseurs.
+
+Deux niveaux comme le cache d'analyse d'ai_routes : un dict LRU local au
+process, et Redis en second niveau quand REDIS_URL est défini pour que
+les workers partagent leurs entrées. Le TTL court borne la fraîcheur :
+une mise à jour (offre marquée vue, préférence modifiée) est visible au
+pire RESPONSE_CACHE_TTL secondes plus tard.
+"""
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+
+import orjson
+
+log = logging.getLogger(__name__)
+
+_env = os.environ.copy()
+
+# Chemins cacheables : GET idempotents, réponse propre à l'utilisateur
+# (la clé inclut l'entête Authorization).
+CACHEABLE_PATHS = frozenset({"/matches", "/matches/count", "/dashboard/stats"})
+
+_TTL = float(_env.get("RESPONSE_CACHE_TTL", "15"))
+_MAX_ENTRIES = 1024
+# Désactivé en test : les assertions vérifient l'effet immédiat des écritures
+_DISABLED = _env.get("ENVIRONMENT") == "test"
+
+_redis = None
+if _env.get("REDIS_URL"):
+    try:
+        import redis
+
+        _redis = redis.Redis.from_url(_env["REDIS_URL"])
+    except Exception as exc:  # pragma: no cover - dépend de l'environnement
+        log.warning("Response cache: Redis indisponible (%s)", exc)
+
+
+def _cache_key(scope) -> bytes | None:
+    """Clé de cache pour la requête, ou None si elle n'est pas cacheable."""
+    auth = None
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            auth = value
+            break
+    if not auth:
+        # Sans Authorization la réponse est un 401 : rien à cacher.
+        return None
+    return hashlib.blake2b(
+        b"\0".join((auth, scope["path"].encode("latin-1"), scope["query_string"])),
+        digest_size=16,
+    ).digest()
+
+
+class ResponseCacheMiddleware:
+    """Middleware ASGI pur servant les GET répétés depuis le cache."""
+
+    def __init__(self, app):
+        self.app = app
+        # clé -> (expiration, status, headers, corps) ; LRU par réinsertion
+        self._local: OrderedDict[bytes, tuple[float, int, list, bytes]] = OrderedDict()
+
+    def _local_get(self, key: bytes):
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._local.pop(key, None)
+            return None
+        self._local.move_to_end(key)
+        return entry
+
+    def _store(self, key: bytes, status: int, headers: list, body: bytes) -> None:
+        self._local[key] = (time.monotonic() + _TTL, status, headers, body)
+        self._local.move_to_end(key)
+        while len(self._local) > _MAX_ENTRIES:
+            self._local.popitem(last=False)
+        if _redis is not None:
+            try:
+                # latin-1 fait l'aller-retour str/bytes sans perte, ce qui
+                # permet de sérialiser le blob complet avec orjson.
+                blob = orjson.dumps(
+                    {
+                        "s": status,
+                        "h": [[n.decode("latin-1"), v.decode("latin-1")] for n, v in headers],
+                        "b": body.decode("latin-1"),
+                    }
+                )
+                _redis.set(b"resp:" + key, blob, ex=int(_TTL))
+            except Exception as exc:
+                log.warning("Response cache write failed: %s", exc)
+
+    def _redis_get(self, key: bytes):
+        if _redis is None:
+            return None
+        try:
+            blob = _redis.get(b"resp:" + key)
+        except Exception as exc:
+            log.warning("Response cache read failed: %s", exc)
+            return None
+        if not blob:
+            return None
+        data = orjson.loads(blob)
+        headers = [
+            (n.encode("latin-1"), v.encode("latin-1")) for n, v in data["h"]
+        ]
+        return data["s"], headers, data["b"].encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if (
+            _DISABLED
+            or scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in CACHEABLE_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = _cache_key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        cached = self._local_get(key)
+        if cached is not None:
+            _, status, headers, body = cached
+        else:
+            hit = self._redis_get(key)
+            if hit is not None:
+                status, headers, body = hit
+                # promotion : les lectures suivantes restent locales
+                self._local[key] = (time.monotonic() + _TTL, status, headers, body)
+            else:
+                status, headers, body = 0, [], b""
+
+        if status:
+            await send(
+                {"type": "http.response.start", "status": status, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        # Cache miss : on laisse passer la requête en copiant la réponse
+        # au fil de l'eau, puis on la range si c'est un 200 complet.
+        captured: dict = {"status": None, "headers": [], "chunks": []}
+
+        async def send_and_capture(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = [
+                    (n, v)
+                    for n, v in message.get("headers", [])
+                    if n != b"set-cookie"
+                ]
+            elif message["type"] == "http.response.body":
+                captured["chunks"].append(message.get("body", b""))
+                if not message.get("more_body", False) and captured["status"] == 200:
+                    self._store(
+                        key,
+                        captured["status"],
+                        captured["headers"],
+                        b"".join(captured["chunks"]),
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
@@ -26,12 +26,19 @@ else:
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args,
+    # Larger compiled-SQL cache: the API re-issues the same statement shapes
+    # on every request, so avoid recompiling them under cache pressure
+    query_cache_size=1200,
     **engine_kwargs,
 )
 
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
+    # Les objets restent lisibles après commit sans re-SELECT : les handlers
+    # sérialisent leur réponse juste après le commit, chaque expiration
+    # coûtait une requête par attribut accédé.
+    expire_on_commit=False,
     bind=engine
 )
 
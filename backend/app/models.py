@@ -1,62 +1,108 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Index
-from datetime import datetime, timezone
+import hashlib
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Text, Boolean, Index, JSON, LargeBinary, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship
 from .db import Base
 
 
+def job_url_hash(url: str) -> bytes:
+    """Empreinte 16 octets d'une URL d'offre, clé de l'index d'unicité."""
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+
+
+def job_is_remote(location, description) -> bool:
+    """Drapeau télétravail dérivé une fois à l'ingestion (JobListing.is_remote)."""
+    return "remote" in f"{location or ''} {description or ''}".lower()
+
+# BIGINT pour les tables à fort volume (offres scrapées) : int32 déborde à
+# l'échelle visée. SQLite garde INTEGER pour conserver l'alias rowid
+# auto-incrémenté ; Postgres stocke un vrai int64.
+BigIntPK = BigInteger().with_variant(Integer, "sqlite")
+
+# JSONB sur Postgres (forme parsée, opérateurs ->>, indexable GIN), JSON
+# générique ailleurs. La (dé)sérialisation passe au driver : plus de
+# json.dumps/loads à la frontière du modèle.
+JSONVariant = JSON().with_variant(JSONB, "postgresql")
+
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Le lookup OAuth filtre toujours sur le couple (provider, id) : un
+        # seul parcours de btree, et l'unicité interdit les doubles liens.
+        # Index partiel : les comptes email/mot de passe n'y figurent pas.
+        Index(
+            "ix_users_oauth_provider_id",
+            "oauth_provider",
+            "oauth_id",
+            unique=True,
+            postgresql_where=text("oauth_provider IS NOT NULL"),
+            sqlite_where=text("oauth_provider IS NOT NULL"),
+        ),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
-    password_hash = Column(String, nullable=True)  # Nullable for OAuth users
+    id = Column(Integer, primary_key=True)
+    email = Column(String(255), unique=True, index=True, nullable=False)
+    password_hash = Column(String(255), nullable=True)  # Nullable for OAuth users
     notifications_enabled = Column(Boolean, default=True, nullable=False)
     email_verified = Column(Boolean, default=False, nullable=False)
     # Token pour désabonnement par email (sans authentification)
     unsubscribe_token = Column(String(64), unique=True, nullable=True, index=True)
     # OAuth fields
-    oauth_provider = Column(String(20), nullable=True, index=True)  # "google", "apple", or null
-    oauth_id = Column(String(255), nullable=True, index=True)  # Provider's unique user ID
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    oauth_provider = Column(String(20), nullable=True)  # "google", "apple", or null
+    oauth_id = Column(String(255), nullable=True)  # Provider's unique user ID
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Chargé à la demande : l'auth récupère un User par requête et n'a pas
+    # besoin de ses offres. Les listes passent par UserJob directement.
+    user_jobs = relationship("UserJob", back_populates="user", passive_deletes=True)
 
 
 class PasswordResetToken(Base):
     """Token for password reset requests"""
     __tablename__ = "password_reset_tokens"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     token = Column(String(64), unique=True, nullable=False, index=True)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
     used = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
 class EmailVerificationToken(Base):
     """Token for email verification"""
     __tablename__ = "email_verification_tokens"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     token = Column(String(64), unique=True, nullable=False, index=True)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
     used = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
 class CV(Base):
     __tablename__ = "cvs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    filename = Column(String, nullable=False)
-    text = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    filename = Column(String(255), nullable=False)
+    # deferred : le texte extrait du PDF pèse plusieurs Ko et la plupart des
+    # requêtes n'en ont pas besoin ; undefer(CV.text) pour le charger.
+    text = deferred(Column(Text, nullable=True))
+    # Mots-clés extraits du texte, joints par des virgules (le tokenizer
+    # n'en produit jamais). Rempli à l'upload ; NULL sur les lignes d'avant
+    # la migration — cv_keywords recalcule et backfille à la lecture.
+    keywords_cached = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
 class UserPreference(Base):
     __tablename__ = "user_preferences"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
     role = Column(String(200), nullable=True)
     location = Column(String(200), nullable=True)
@@ -71,25 +117,79 @@ class UserPreference(Base):
     notification_max_jobs = Column(Integer, default=5, nullable=False)
 
     # Recherche automatique
-    last_search_at = Column(DateTime, nullable=True)  # Dernière recherche automatique
-    last_email_at = Column(DateTime, nullable=True)   # Dernier email envoyé
+    last_search_at = Column(DateTime(timezone=True), nullable=True)  # Dernière recherche automatique
+    last_email_at = Column(DateTime(timezone=True), nullable=True)   # Dernier email envoyé
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
 class JobListing(Base):
     __tablename__ = "job_listings"
+    __table_args__ = (
+        # BRIN : created_at est monotone sur une table append-only, min/max
+        # par plage de pages suffit pour les requêtes "derniers N jours" et
+        # l'index reste minuscule comparé à un btree. (Rendu en index simple
+        # sur SQLite, qui ignore les options postgresql_*.)
+        Index(
+            "ix_job_listings_created_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+        # Composite pour les requêtes "source X depuis la date Y" : les index
+        # mono-colonne sur source et created_at ne se combinent pas bien.
+        Index("ix_joblisting_created_source", "created_at", "source"),
+        # L'unicité porte sur le hash 16 octets plutôt que sur l'URL brute :
+        # un btree de clés fixes courtes au lieu de clés jusqu'à 2000 chars.
+        Index("ux_joblisting_url_hash", "url_hash", unique=True),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigIntPK, primary_key=True)
     source = Column(String(50), nullable=False, index=True)  # e.g. LinkedIn
     title = Column(String(500), nullable=False)
     company = Column(String(200), nullable=False, index=True)
     location = Column(String(200), nullable=True, index=True)
-    url = Column(String(2000), nullable=False, unique=True)
-    description = Column(Text, nullable=True)
+    url = Column(String(2000), nullable=False)
+    # Renseigné automatiquement depuis url si absent à l'INSERT
+    url_hash = Column(
+        LargeBinary(16),
+        nullable=False,
+        default=lambda ctx: job_url_hash(ctx.get_current_parameters()["url"]),
+    )
+    # deferred : même logique que CV.text — les listings/dédoublonnages ne
+    # lisent pas le corps de l'offre, seuls le scoring et l'API le chargent.
+    description = deferred(Column(Text, nullable=True))
     salary_min = Column(Integer, nullable=True)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
+    # Calculé à l'ingestion (job_is_remote) : lecture d'une colonne au
+    # lieu d'un scan de la description par offre affichée. NULL sur les
+    # lignes d'avant la migration — les lecteurs redérivent à la volée.
+    is_remote = Column(Boolean, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # lazy="raise" : tout accès implicite lève — un appelant qui veut le corps
+    # déporté doit le charger explicitement via selectinload(JobListing.body).
+    body = relationship(
+        "JobListingBody",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
+    )
+
+
+class JobListingBody(Base):
+    """
+    Partition verticale du texte d'offre : le gros TEXT vit dans sa propre
+    table pour garder les lignes de job_listings compactes (plus de lignes
+    par page, meilleurs scans). job_listings.description reste la source de
+    lecture pendant la transition ; cette table est alimentée en double à
+    l'ingestion.
+    """
+    __tablename__ = "job_listing_bodies"
+
+    job_id = Column(BigIntPK, ForeignKey("job_listings.id", ondelete="CASCADE"), primary_key=True)
+    description = Column(Text, nullable=True)
 
 
 class UserJob(Base):
@@ -103,9 +203,9 @@ class UserJob(Base):
         Index("ix_user_job_user_job", "user_id", "job_id", unique=True),
     )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigIntPK, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
-    job_id = Column(Integer, ForeignKey("job_listings.id", ondelete="CASCADE"), nullable=False, index=True)
+    job_id = Column(BigIntPK, ForeignKey("job_listings.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Score de pertinence (0-10)
     score = Column(Integer, nullable=True)
@@ -114,9 +214,14 @@ class UserJob(Base):
     status = Column(String(20), default="new", nullable=False)
 
     # Dates
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    viewed_at = Column(DateTime, nullable=True)
-    notified_at = Column(DateTime, nullable=True)  # Dernière notification par email
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    viewed_at = Column(DateTime(timezone=True), nullable=True)
+    notified_at = Column(DateTime(timezone=True), nullable=True)  # Dernière notification par email
+
+    # selectin : un seul SELECT ... IN (...) pour toutes les offres d'une page
+    # au lieu d'une requête par ligne (N+1) quand le code accède à user_job.job.
+    job = relationship("JobListing", lazy="selectin")
+    user = relationship("User", back_populates="user_jobs")
 
 
 class JobSearchRun(Base):
@@ -124,20 +229,26 @@ class JobSearchRun(Base):
     __table_args__ = (
         # Composite index for efficient "latest run by user" queries
         Index("ix_job_search_run_user_created", "user_id", "created_at"),
+        Index(
+            "ix_job_search_runs_created_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
     )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     inserted = Column(Integer, nullable=False)
-    tried_queries = Column(Text, nullable=True)  # JSON list
-    sources = Column(Text, nullable=True)  # JSON dict
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
-    analysis_json = Column(Text, nullable=True)
+    tried_queries = Column(JSONVariant, nullable=True)  # liste
+    sources = Column(JSONVariant, nullable=True)  # dict
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    analysis_json = Column(JSONVariant, nullable=True)
 
 
 class UserAnalysisCache(Base):
     __tablename__ = "user_analysis_cache"
 
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)
-    analysis_json = Column(Text, nullable=True)
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    analysis_json = Column(JSONVariant, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,17 +1,23 @@
 """
 OAuth2 configuration for Google Sign-In
 """
+import asyncio
+import json
 import logging
 import os
 import secrets
+import time
 from typing import Optional
 from urllib.parse import urlencode
 
 log = logging.getLogger(__name__)
 
 import httpx
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
+from jose import JWTError, jwt as jose_jwt
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.deps import get_db
@@ -28,8 +34,111 @@ GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 
-# OAuth state storage (in production, use Redis or similar)
-_oauth_states: dict[str, dict] = {}
+# Stockage des states CSRF OAuth. Avec REDIS_URL : partagé entre workers et
+# expiré automatiquement par Redis. Sans : repli mémoire avec TTL + purge
+# paresseuse pour le dev mono-processus (l'ancien dict grossissait sans
+# limite sur les logins abandonnés).
+OAUTH_STATE_TTL = 600  # secondes
+
+_redis = None
+_redis_url = os.getenv("REDIS_URL", "")
+if _redis_url:
+    try:
+        import redis
+
+        _redis = redis.Redis.from_url(_redis_url, decode_responses=True)
+    except Exception as exc:  # pragma: no cover - dépend de l'environnement
+        log.warning("Redis indisponible pour les states OAuth (%s), repli mémoire", exc)
+
+_oauth_states: dict[str, tuple[float, dict]] = {}
+
+
+def _store_oauth_state(state: str, payload: dict) -> None:
+    if _redis is not None:
+        _redis.set(f"oauth:state:{state}", json.dumps(payload), ex=OAUTH_STATE_TTL, nx=True)
+        return
+    now = time.monotonic()
+    expired = [s for s, (ts, _) in _oauth_states.items() if now - ts > OAUTH_STATE_TTL]
+    for s in expired:
+        _oauth_states.pop(s, None)
+    _oauth_states[state] = (now, payload)
+
+
+def _pop_oauth_state(state: str) -> Optional[dict]:
+    """Récupère et invalide un state en une seule opération (anti-rejeu)."""
+    if _redis is not None:
+        raw = _redis.getdel(f"oauth:state:{state}")
+        return json.loads(raw) if raw else None
+    entry = _oauth_states.pop(state, None)
+    if entry is None:
+        return None
+    ts, payload = entry
+    if time.monotonic() - ts > OAUTH_STATE_TTL:
+        return None
+    return payload
+
+
+# Client HTTP partagé : garde les connexions TLS vers Google ouvertes entre
+# les callbacks au lieu de payer pool + DNS + handshake à chaque login.
+# Fermé proprement au shutdown de l'app (voir main.py).
+_http = httpx.AsyncClient(
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=32),
+)
+
+
+async def close_http_client() -> None:
+    await _http.aclose()
+
+
+# Cache du JWKS Google : les clés de signature tournent rarement, un TTL
+# d'une heure évite un aller-retour HTTPS par login tout en suivant les
+# rotations (re-fetch forcé si un kid inconnu se présente).
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+_JWKS_TTL = 3600.0
+_jwks_cache: dict = {"keys": {}, "fetched_at": 0.0}
+
+
+async def _get_google_jwks(force: bool = False) -> dict[str, dict]:
+    now = time.monotonic()
+    if not force and _jwks_cache["keys"] and now - _jwks_cache["fetched_at"] < _JWKS_TTL:
+        return _jwks_cache["keys"]
+    resp = await _http.get(GOOGLE_JWKS_URL)
+    resp.raise_for_status()
+    _jwks_cache["keys"] = {k["kid"]: k for k in resp.json().get("keys", [])}
+    _jwks_cache["fetched_at"] = now
+    return _jwks_cache["keys"]
+
+
+async def verify_google_id_token(id_token: str) -> dict:
+    """Vérifie signature et claims d'un id_token Google via le JWKS en cache."""
+    try:
+        kid = jose_jwt.get_unverified_header(id_token).get("kid")
+    except JWTError:
+        raise HTTPException(status_code=400, detail="Invalid id_token")
+
+    keys = await _get_google_jwks()
+    key = keys.get(kid)
+    if key is None:
+        # Rotation de clés possible : on force un re-fetch une seule fois
+        keys = await _get_google_jwks(force=True)
+        key = keys.get(kid)
+    if key is None:
+        raise HTTPException(status_code=400, detail="Invalid id_token")
+
+    try:
+        claims = jose_jwt.decode(
+            id_token,
+            key,
+            algorithms=["RS256"],
+            audience=GOOGLE_CLIENT_ID,
+        )
+    except JWTError:
+        raise HTTPException(status_code=400, detail="Invalid id_token")
+
+    if claims.get("iss") not in ("https://accounts.google.com", "accounts.google.com"):
+        raise HTTPException(status_code=400, detail="Invalid id_token")
+    return claims
 
 
 def get_google_auth_url(state: str) -> str:
@@ -48,33 +157,34 @@ def get_google_auth_url(state: str) -> str:
 
 async def exchange_google_code(code: str) -> dict:
     """Exchange Google authorization code for tokens and user info"""
-    async with httpx.AsyncClient() as client:
-        # Exchange code for tokens
-        token_response = await client.post(
-            "https://oauth2.googleapis.com/token",
-            data={
-                "client_id": GOOGLE_CLIENT_ID,
-                "client_secret": GOOGLE_CLIENT_SECRET,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": f"{BACKEND_URL}/auth/oauth/google/callback",
-            },
-        )
-        if token_response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Failed to exchange code")
+    # Exchange code for tokens
+    token_response = await _http.post(
+        "https://oauth2.googleapis.com/token",
+        data={
+            "client_id": GOOGLE_CLIENT_ID,
+            "client_secret": GOOGLE_CLIENT_SECRET,
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": f"{BACKEND_URL}/auth/oauth/google/callback",
+        },
+    )
+    if token_response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Failed to exchange code")
 
-        tokens = token_response.json()
-        access_token = tokens.get("access_token")
+    tokens = token_response.json()
 
-        # Get user info
-        userinfo_response = await client.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
-        if userinfo_response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Failed to get user info")
+    # Avec le scope openid, l'id_token vérifié contient déjà sub/email :
+    # le décoder localement évite l'aller-retour /userinfo à chaque login.
+    id_token = tokens.get("id_token")
+    if not id_token:
+        raise HTTPException(status_code=400, detail="Failed to exchange code")
+    claims = await verify_google_id_token(id_token)
 
-        return userinfo_response.json()
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "verified_email": claims.get("email_verified", False),
+    }
 
 
 def get_or_create_oauth_user(
@@ -85,17 +195,61 @@ def get_or_create_oauth_user(
     email_verified: bool = False,
 ) -> User:
     """Get existing user or create new one from OAuth data"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Lookup préalable par (provider, oauth_id) : un utilisateur dont
+        # l'email a changé chez le fournisseur ne matche plus sur email et
+        # partirait en INSERT, qui violerait ix_users_oauth_provider_id.
+        user = db.execute(
+            select(User).where(
+                User.oauth_provider == provider,
+                User.oauth_id == oauth_id,
+            )
+        ).scalar_one_or_none()
+        if user:
+            return user
+
+        # Un seul aller-retour : INSERT ... ON CONFLICT (email) DO UPDATE
+        # couvre à la fois la création, le lien OAuth sur compte existant et
+        # la course entre deux callbacks simultanés.
+        stmt = (
+            pg_insert(User)
+            .values(
+                email=email,
+                password_hash=None,
+                oauth_provider=provider,
+                oauth_id=oauth_id,
+                email_verified=email_verified,
+                notifications_enabled=True,
+            )
+            .on_conflict_do_update(
+                index_elements=["email"],
+                set_={
+                    "oauth_provider": provider,
+                    "oauth_id": oauth_id,
+                    # ne jamais rétrograder un email déjà vérifié
+                    "email_verified": text("users.email_verified OR EXCLUDED.email_verified"),
+                },
+            )
+            .returning(User)
+        )
+        user = db.execute(stmt).scalar_one()
+        db.commit()
+        return user
+
+    # SQLite (dev/test) : logique lisible en 2-3 requêtes
     # First, try to find by OAuth provider + ID
-    user = db.query(User).filter(
-        User.oauth_provider == provider,
-        User.oauth_id == oauth_id,
-    ).first()
+    user = db.execute(
+        select(User).where(
+            User.oauth_provider == provider,
+            User.oauth_id == oauth_id,
+        )
+    ).scalar_one_or_none()
 
     if user:
         return user
 
     # Try to find by email (link existing account)
-    user = db.query(User).filter(User.email == email).first()
+    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
     if user:
         # Link OAuth to existing account
         user.oauth_provider = provider
@@ -103,7 +257,6 @@ def get_or_create_oauth_user(
         if email_verified:
             user.email_verified = True
         db.commit()
-        db.refresh(user)
         return user
 
     # Create new user
@@ -116,8 +269,8 @@ def get_or_create_oauth_user(
         notifications_enabled=True,
     )
     db.add(user)
+    # le flush récupère déjà l'id auto-incrémenté, pas besoin de refresh
     db.commit()
-    db.refresh(user)
     return user
 
 
@@ -131,7 +284,7 @@ async def google_login():
         raise HTTPException(status_code=503, detail="Google OAuth not configured")
 
     state = secrets.token_urlsafe(32)
-    _oauth_states[state] = {"provider": "google"}
+    _store_oauth_state(state, {"provider": "google"})
 
     return RedirectResponse(url=get_google_auth_url(state))
 
@@ -142,16 +295,15 @@ async def google_callback(
     code: Optional[str] = None,
     state: Optional[str] = None,
     error: Optional[str] = None,
+    db: Session = Depends(get_db),
 ):
     """Handle Google OAuth callback"""
     if error:
         return RedirectResponse(url=f"{FRONTEND_URL}/login?error=oauth_denied")
 
-    if not state or state not in _oauth_states:
+    if not state or _pop_oauth_state(state) is None:
         return RedirectResponse(url=f"{FRONTEND_URL}/login?error=invalid_state")
 
-    del _oauth_states[state]
-
     if not code:
         return RedirectResponse(url=f"{FRONTEND_URL}/login?error=no_code")
 
@@ -159,26 +311,24 @@ async def google_callback(
         # Exchange code for user info
         user_info = await exchange_google_code(code)
 
-        # Get or create user
-        db = next(get_db())
-        try:
-            user = get_or_create_oauth_user(
-                db=db,
-                provider="google",
-                oauth_id=user_info.get("id"),
-                email=user_info.get("email"),
-                email_verified=user_info.get("verified_email", False),
-            )
+        # Get or create user. SQLAlchemy sync : déporté dans un thread pour
+        # ne pas bloquer l'event loop pendant les allers-retours DB.
+        user = await asyncio.to_thread(
+            get_or_create_oauth_user,
+            db=db,
+            provider="google",
+            oauth_id=user_info.get("id"),
+            email=user_info.get("email"),
+            email_verified=user_info.get("verified_email", False),
+        )
 
-            # Create JWT token
-            token = create_access_token(user.id)
+        # Create JWT token
+        token = create_access_token(user.id)
 
-            # Redirect to frontend with token
-            return RedirectResponse(
-                url=f"{FRONTEND_URL}/oauth/callback?token={token}"
-            )
-        finally:
-            db.close()
+        # Redirect to frontend with token
+        return RedirectResponse(
+            url=f"{FRONTEND_URL}/oauth/callback?token={token}"
+        )
     except Exception as e:
         log.error("Google OAuth error: %s", e)
         return RedirectResponse(url=f"{FRONTEND_URL}/login?error=oauth_failed")
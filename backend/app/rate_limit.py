@@ -2,37 +2,135 @@
 Rate limiting configuration for the API.
 Uses slowapi to implement rate limiting on sensitive endpoints.
 """
+import logging
 import os
+import sys
+
+from limits import parse as parse_limit
+from limits.storage.memory import MemoryStorage
 from slowapi import Limiter
-from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from fastapi import Request
-from fastapi.responses import JSONResponse
+
+from fastapi import Request, Response
+
+log = logging.getLogger(__name__)
+
+# Instantané de l'environnement : toute la config du module se lit ici,
+# en un seul endroit, au chargement.
+_env = os.environ.copy()
+
+
+# Borne le scan d'un X-Forwarded-For anormalement long (entêtes forgés)
+_XFF_MAX_LEN = 512
+# Les entêtes ASGI sont déjà en minuscules côté serveur
+_XFF = b"x-forwarded-for"
 
 
 def get_client_ip(request: Request) -> str:
     """
     Get client IP address, respecting X-Forwarded-For header for proxied requests.
     """
-    forwarded = request.headers.get("X-Forwarded-For")
+    # Scan direct de scope["headers"] : évite la construction/normalisation
+    # du wrapper Headers de Starlette à chaque requête limitée.
+    forwarded = None
+    for name, value in request.scope["headers"]:
+        if name == _XFF:
+            forwarded = value[:_XFF_MAX_LEN].decode("latin-1")
+            break
     if forwarded:
-        # Take the first IP in the chain (original client)
-        return forwarded.split(",")[0].strip()
-    return get_remote_address(request)
+        # Première IP de la chaîne (client d'origine), sans découper toute
+        # la liste : find + slice évite d'allouer N segments par requête.
+        i = forwarded.find(",")
+        head = forwarded if i < 0 else forwarded[:i]
+        if head := head.strip():
+            return head
+    client = request.client
+    return client.host if client else "127.0.0.1"
+
+
+def _validated_limit(spec: str, fallback: str) -> str:
+    """Valide une spécification de limite au chargement plutôt qu'à la
+    première requête limitée (une valeur d'env malformée ferait un 500)."""
+    try:
+        parse_limit(spec)
+        return spec
+    except ValueError:
+        log.warning("Invalid rate limit %r, falling back to %r", spec, fallback)
+        return fallback
 
 
 # Rate limits configuration (can be overridden via env vars)
-AUTH_RATE_LIMIT = os.getenv("AUTH_RATE_LIMIT", "5/minute")
-API_RATE_LIMIT = os.getenv("API_RATE_LIMIT", "60/minute")
+AUTH_RATE_LIMIT = _validated_limit(_env.get("AUTH_RATE_LIMIT", "5/minute"), "5/minute")
+API_RATE_LIMIT = _validated_limit(_env.get("API_RATE_LIMIT", "60/minute"), "60/minute")
 
 # Disable rate limiting in test environment
-IS_TESTING = os.getenv("ENVIRONMENT") == "test"
+IS_TESTING = _env.get("ENVIRONMENT") == "test"
+
+
+class BoundedMemoryStorage(MemoryStorage):
+    """MemoryStorage avec un plafond sur le nombre de buckets par IP.
+
+    Le stockage mémoire de limits ne purge les clés qu'à expiration : un
+    balayage d'IPs forgées (X-Forwarded-For) peut faire grossir les dicts
+    sans borne dans chaque worker. On plafonne à MAX_KEYS buckets et on
+    évince le moins récemment utilisé — les dicts Python gardent l'ordre
+    d'insertion, un pop/réinsertion O(1) suffit pour le rafraîchir.
+
+    Enregistré sous le schéma ``bounded-memory://`` : slowapi ne prend
+    qu'une storage_uri, le registre de schémas de limits sert de point
+    d'injection.
+    """
+
+    STORAGE_SCHEME = ["bounded-memory"]
+    MAX_KEYS = 100_000
+
+    def _touch(self, bucket: dict, key: str) -> None:
+        # Rafraîchit la récence (réinsertion en fin de dict) ; si la clé
+        # est nouvelle et que le dict est plein, évince la plus ancienne.
+        if key in bucket:
+            bucket[key] = bucket.pop(key)
+        elif len(bucket) >= self.MAX_KEYS:
+            oldest = next(iter(bucket))
+            bucket.pop(oldest, None)
+            self.expirations.pop(oldest, None)
+            self.locks.pop(oldest, None)
 
-# Create the limiter instance
-limiter = Limiter(key_func=get_client_ip, enabled=not IS_TESTING)
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        self._touch(self.events, key)
+        return super().acquire_entry(key, limit, expiry, amount)
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        self._touch(self.storage, key)
+        return super().incr(key, expiry, amount)
+
+class _NoopLimiter:
+    """Remplace le Limiter en environnement de test.
+
+    ``enabled=False`` laissait slowapi envelopper chaque endpoint décoré
+    et re-tester le drapeau à chaque requête ; ici le décorateur rend la
+    fonction telle quelle, il ne reste aucun wrapper sur le chemin chaud.
+    """
+
+    enabled = False
+
+    def limit(self, *args, **kwargs):
+        return lambda func: func
+
+
+# Create the limiter instance. Avec REDIS_URL, les compteurs vivent dans
+# Redis : partagés entre workers (sinon la limite réelle est N × workers)
+# et expirés par le serveur au lieu de grossir dans un dict par process.
+if IS_TESTING:
+    limiter = _NoopLimiter()
+else:
+    limiter = Limiter(
+        key_func=get_client_ip,
+        storage_uri=_env.get("REDIS_URL") or "bounded-memory://",
+        strategy="moving-window",
+    )
 
 # CORS allowed origins for exception handlers - built once at startup
-def _build_allowed_origins() -> set[str]:
+def _build_allowed_origins() -> frozenset[str]:
     """Build the set of allowed CORS origins at startup."""
     origins = {
         "http://localhost:3000",
@@ -40,29 +138,60 @@ def _build_allowed_origins() -> set[str]:
         "https://alizejobfinder.com",
         "https://www.alizejobfinder.com",
     }
-    extra_origins = os.getenv("CORS_ORIGINS", "")
+    extra_origins = _env.get("CORS_ORIGINS", "")
     if extra_origins:
         origins.update(o.strip() for o in extra_origins.split(",") if o.strip())
-    frontend_url = os.getenv("FRONTEND_URL")
+    frontend_url = _env.get("FRONTEND_URL")
     if frontend_url:
         origins.add(frontend_url)
-    return origins
+    # frozenset d'origines internées : le test d'appartenance se réduit à
+    # une comparaison de pointeurs quand l'origine entrante est internée
+    # aussi, et l'ensemble ne peut plus être modifié par accident.
+    return frozenset(sys.intern(o) for o in origins)
 
 CORS_ALLOWED_ORIGINS = _build_allowed_origins()
 
+# Les origines sont figées au démarrage : le dict complet d'entêtes par
+# origine est précalculé une fois, le handler fait un seul lookup.
+_CORS_HEADERS_BY_ORIGIN: dict[str, dict[str, str]] = {
+    origin: {
+        "Access-Control-Allow-Origin": origin,
+        "Access-Control-Allow-Credentials": "true",
+        "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, PATCH",
+        "Access-Control-Allow-Headers": "Authorization, Content-Type, Accept, Origin, X-Requested-With",
+        # Laisse le navigateur mettre le préflight en cache 10 min au lieu
+        # de re-OPTIONS après chaque erreur ; Vary protège les caches
+        # intermédiaires puisque la réponse dépend de l'origine.
+        "Access-Control-Max-Age": "600",
+        "Vary": "Origin",
+    }
+    for origin in CORS_ALLOWED_ORIGINS
+}
+_NO_CORS_HEADERS: dict[str, str] = {}
+
+
+def _get_cors_headers(request: Request) -> dict[str, str] | None:
+    """Get CORS headers for the response based on request origin.
+
+    None (= aucune entête ajoutée) pour le trafic sans Origin — probes,
+    appels serveur-à-serveur — qui n'a rien à faire du CORS.
+    """
+    origin = request.headers.get("origin")
+    if not origin:
+        return None
+    if len(origin) < 128:
+        origin = sys.intern(origin)
+    return _CORS_HEADERS_BY_ORIGIN.get(origin, _NO_CORS_HEADERS)
 
-def _get_cors_headers(request: Request) -> dict[str, str]:
-    """Get CORS headers for the response based on request origin."""
-    origin = request.headers.get("origin", "")
 
-    if origin in CORS_ALLOWED_ORIGINS:
-        return {
-            "Access-Control-Allow-Origin": origin,
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS, PATCH",
-            "Access-Control-Allow-Headers": "Authorization, Content-Type, Accept, Origin, X-Requested-With",
-        }
-    return {}
+# Gabarit encodé une fois à l'import : le handler n'a plus qu'une
+# interpolation d'octets à faire, ni sérialisation JSON ni encodage UTF-8
+# du texte français par réponse. Le retry_after vient de slowapi
+# ("N per X minute") : ASCII sans caractère à échapper.
+_STATIC_429 = (
+    '{"detail":"Trop de requêtes. Veuillez patienter avant de réessayer.",'
+    '"error":"rate_limit_exceeded","retry_after":"%s"}'
+).encode("utf-8")
 
 
 def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
@@ -70,12 +199,9 @@ def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
     Custom handler for rate limit exceeded errors.
     Returns a JSON response with proper error details and CORS headers.
     """
-    return JSONResponse(
+    return Response(
+        content=_STATIC_429 % str(exc.detail).encode(),
         status_code=429,
-        content={
-            "detail": "Trop de requêtes. Veuillez patienter avant de réessayer.",
-            "error": "rate_limit_exceeded",
-            "retry_after": exc.detail,
-        },
+        media_type="application/json",
         headers=_get_cors_headers(request),
     )
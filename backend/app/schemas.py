@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, EmailStr
+from typing import Any, Literal
 from datetime import datetime
 from pydantic import Field
 
@@ -12,98 +12,106 @@ class LoginIn(BaseModel):
     password: str = Field(min_length=1, max_length=128)
 
 class TokenOut(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     access_token: str
     token_type: str = "bearer"
 
 
 class PreferenceIn(BaseModel):
-    role: Optional[str] = None
-    location: Optional[str] = None
-    contract_type: Optional[str] = None
-    salary_min: Optional[int] = None
-    must_keywords: Optional[str] = None
-    avoid_keywords: Optional[str] = None
-    notification_frequency: Optional[str] = Field(
-        default=None,
-        pattern=r"^(daily|weekly|every_3_days)$",
-    )
-    send_empty_digest: Optional[bool] = None
-    notification_max_jobs: Optional[int] = Field(default=None, ge=1, le=10)
+    role: str | None = None
+    location: str | None = None
+    contract_type: str | None = None
+    salary_min: int | None = None
+    must_keywords: str | None = None
+    avoid_keywords: str | None = None
+    # Literal : test d'appartenance, pas de moteur regex par validation
+    notification_frequency: Literal["daily", "weekly", "every_3_days"] | None = None
+    send_empty_digest: bool | None = None
+    notification_max_jobs: int | None = Field(default=None, ge=1, le=10)
 
 
 class PreferenceOut(PreferenceIn):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     user_id: int
 
 
 class CVOut(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     filename: str
     created_at: datetime
-    text: Optional[str] = None
+    text: str | None = None
     url: str
 
 
 class JobOut(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     source: str
     title: str
     company: str
-    location: Optional[str] = None
+    location: str | None = None
     url: str
-    description: Optional[str] = None
-    salary_min: Optional[int] = None
-    score: Optional[int] = None
-    is_remote: Optional[bool] = None
-    is_new: Optional[bool] = None
-    is_saved: Optional[bool] = None  # Pour indiquer si l'offre est sauvegardée
-    status: Optional[str] = None  # new, viewed, saved, deleted
-    created_at: Optional[datetime] = None
-    match_reasons: List[str] = []
+    description: str | None = None
+    salary_min: int | None = None
+    score: int | None = None
+    is_remote: bool | None = None
+    is_new: bool | None = None
+    is_saved: bool | None = None  # Pour indiquer si l'offre est sauvegardée
+    status: str | None = None  # new, viewed, saved, deleted
+    created_at: datetime | None = None
+    match_reasons: list[str] = Field(default_factory=list)
 
 
 class MatchesPage(BaseModel):
-    items: List[JobOut]
+    model_config = ConfigDict(defer_build=True)
+
+    items: list[JobOut]
     total: int
     page: int
     page_size: int
-    available_sources: List[str] = []
+    available_sources: list[str] = Field(default_factory=list)
     new_count: int = 0  # Total count of new offers (for badge)
 
 
 class WorkExperience(BaseModel):
     """Structured work experience from CV"""
-    company: Optional[str] = None
-    title: Optional[str] = None
-    period: Optional[str] = None
-    start_date: Optional[str] = None
-    end_date: Optional[str] = None
+    company: str | None = None
+    title: str | None = None
+    period: str | None = None
+    start_date: str | None = None
+    end_date: str | None = None
     is_current: bool = False
-    duration_years: Optional[float] = None
-    responsibilities: List[str] = []
-    achievements: List[str] = []
+    duration_years: float | None = None
+    responsibilities: list[str] = Field(default_factory=list)
+    achievements: list[str] = Field(default_factory=list)
 
 
 class Project(BaseModel):
     """Project extracted from CV"""
-    name: Optional[str] = None
-    description: Optional[str] = None
-    technologies: List[str] = []
-    impact: Optional[str] = None
+    name: str | None = None
+    description: str | None = None
+    technologies: list[str] = Field(default_factory=list)
+    impact: str | None = None
 
 
 class Achievement(BaseModel):
     """Quantified achievement from CV"""
     type: str  # growth, cost_saving, team_management, project, business, other
-    value: Optional[str] = None
+    value: str | None = None
     context: str
-    raw_match: Optional[str] = None
+    raw_match: str | None = None
 
 
 class CertificationItem(BaseModel):
     """Individual certification"""
     name: str
-    score: Optional[str] = None
+    score: str | None = None
 
 
 class CVQualityBreakdown(BaseModel):
@@ -118,63 +126,67 @@ class CVQualityScore(BaseModel):
     total_score: int  # 0-100
     grade: str  # A, B, C, D, E
     assessment: str  # Overall assessment text
-    breakdown: dict[str, CVQualityBreakdown] = {}
-    suggestions: List[str] = []
-    strengths: List[str] = []
+    breakdown: dict[str, CVQualityBreakdown] = Field(default_factory=dict)
+    suggestions: list[str] = Field(default_factory=list)
+    strengths: list[str] = Field(default_factory=list)
 
 
 class AnalysisOut(BaseModel):
     """Comprehensive CV analysis output"""
+    model_config = ConfigDict(defer_build=True)
+
     # Basic info
     cv_present: bool
     llm_used: bool = False
     summary: str
 
     # Target profile
-    titre_poste_cible: Optional[str] = None
-    inferred_roles: List[str] = []
-    secteurs_cibles: List[str] = []
+    titre_poste_cible: str | None = None
+    inferred_roles: list[str] = Field(default_factory=list)
+    secteurs_cibles: list[str] = Field(default_factory=list)
 
     # Experience
-    niveau_experience: Optional[str] = None
-    experience_level: Optional[str] = None  # Alias for compatibility
+    niveau_experience: str | None = None
+    experience_level: str | None = None  # Alias for compatibility
     total_experience_years: float = 0
-    experiences: List[dict] = []  # List of WorkExperience as dict
+    experiences: list[dict[str, Any]] = Field(default_factory=list)  # List of WorkExperience as dict
 
     # Skills
-    top_keywords: List[str] = []
-    competences_techniques: List[str] = []
-    competences_transversales: List[str] = []
-    skill_categories: dict[str, List[str]] = {}
-    skills_by_category: dict[str, List[str]] = {}
+    top_keywords: list[str] = Field(default_factory=list)
+    competences_techniques: list[str] = Field(default_factory=list)
+    competences_transversales: list[str] = Field(default_factory=list)
+    skill_categories: dict[str, list[str]] = Field(default_factory=dict)
+    skills_by_category: dict[str, list[str]] = Field(default_factory=dict)
     tech_skills_count: int = 0
 
     # Education & Certifications
-    formation: Optional[str] = None
-    education: dict[str, List[str]] = {}  # {"ecoles": [], "diplomes": []}
-    certifications: dict[str, List[dict]] = {}  # By category
-    certifications_list: List[str] = []  # Flat list for display
+    formation: str | None = None
+    education: dict[str, list[str]] = Field(default_factory=dict)  # {"ecoles": [], "diplomes": []}
+    certifications: dict[str, list[dict[str, Any]]] = Field(default_factory=dict)  # By category
+    certifications_list: list[str] = Field(default_factory=list)  # Flat list for display
 
     # Languages
-    langues: List[str] = []
+    langues: list[str] = Field(default_factory=list)
 
     # Achievements & Projects
-    achievements: List[dict] = []  # List of Achievement as dict
-    projets: List[dict] = []  # List of Project as dict
+    achievements: list[dict[str, Any]] = Field(default_factory=list)  # List of Achievement as dict
+    projets: list[dict[str, Any]] = Field(default_factory=list)  # List of Project as dict
 
     # CV Quality
-    cv_quality_score: Optional[dict] = None  # CVQualityScore as dict
-    points_forts: List[str] = []
-    axes_amelioration: List[str] = []
-    conseils_personnalises: List[str] = []
+    cv_quality_score: dict[str, Any] | None = None  # CVQualityScore as dict
+    points_forts: list[str] = Field(default_factory=list)
+    axes_amelioration: list[str] = Field(default_factory=list)
+    conseils_personnalises: list[str] = Field(default_factory=list)
 
     # Job search
-    suggested_queries: List[str] = []
-    must_hits: List[str] = []
-    missing_must: List[str] = []
+    suggested_queries: list[str] = Field(default_factory=list)
+    must_hits: list[str] = Field(default_factory=list)
+    missing_must: list[str] = Field(default_factory=list)
 
 
 class JobSearchOut(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     inserted: int
     tried_queries: list[str]
     sources: dict[str, int]
@@ -182,6 +194,8 @@ class JobSearchOut(BaseModel):
 
 
 class ProfileOut(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     email: EmailStr
     notifications_enabled: bool
@@ -191,17 +205,19 @@ class ProfileOut(BaseModel):
 
 
 class ProfileUpdate(BaseModel):
-    email: Optional[EmailStr] = None
-    current_password: Optional[str] = Field(default=None, min_length=1, description="Required when changing password")
-    new_password: Optional[str] = Field(default=None, min_length=8)
-    notifications_enabled: Optional[bool] = None
+    email: EmailStr | None = None
+    current_password: str | None = Field(default=None, min_length=1, description="Required when changing password")
+    new_password: str | None = Field(default=None, min_length=8)
+    notifications_enabled: bool | None = None
 
 
 class JobSearchRunOut(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     inserted: int
     tried_queries: list[str]
-    sources: dict
+    sources: dict[str, int]
     created_at: datetime
 
 
@@ -219,6 +235,8 @@ class PasswordResetConfirm(BaseModel):
 
 class PasswordResetResponse(BaseModel):
     """Response for password reset request"""
+    model_config = ConfigDict(defer_build=True)
+
     message: str
     success: bool = True
 
@@ -226,7 +244,7 @@ class PasswordResetResponse(BaseModel):
 # Email Verification Schemas
 class EmailVerificationRequest(BaseModel):
     """Request email verification resend"""
-    email: Optional[EmailStr] = None
+    email: EmailStr | None = None
 
 
 class EmailVerificationConfirm(BaseModel):
@@ -236,6 +254,8 @@ class EmailVerificationConfirm(BaseModel):
 
 class EmailVerificationResponse(BaseModel):
     """Response for email verification"""
+    model_config = ConfigDict(defer_build=True)
+
     message: str
     success: bool = True
 
@@ -244,25 +264,29 @@ class EmailVerificationResponse(BaseModel):
 
 class UserJobUpdate(BaseModel):
     """Mettre à jour le statut d'une offre"""
-    status: str = Field(pattern=r"^(new|viewed|saved|deleted)$")
+    status: Literal["new", "viewed", "saved", "deleted"]
 
 
 class UserJobOut(BaseModel):
     """Offre dans le dashboard de l'utilisateur"""
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     job_id: int
-    score: Optional[int] = None
+    score: int | None = None
     status: str
     created_at: datetime
-    viewed_at: Optional[datetime] = None
+    viewed_at: datetime | None = None
 
     # Job info (joined)
-    job: Optional[JobOut] = None
+    job: JobOut | None = None
 
 
 class UserJobsPage(BaseModel):
     """Page d'offres pour le dashboard"""
-    items: List[UserJobOut]
+    model_config = ConfigDict(defer_build=True)
+
+    items: list[UserJobOut]
     total: int
     page: int
     page_size: int
@@ -273,9 +297,11 @@ class UserJobsPage(BaseModel):
 
 class DashboardStatsOut(BaseModel):
     """Statistiques simples du dashboard"""
+    model_config = ConfigDict(defer_build=True)
+
     total_jobs: int
     new_jobs: int
     viewed_jobs: int
     saved_jobs: int
-    last_search_at: Optional[datetime] = None
-    next_email_at: Optional[datetime] = None
+    last_search_at: datetime | None = None
+    next_email_at: datetime | None = None
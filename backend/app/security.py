@@ -1,12 +1,22 @@
+import base64
+import hashlib
+import hmac
+import json
 import os
 import logging
-from datetime import datetime, timedelta, timezone
+import time
+from collections import OrderedDict
 from passlib.context import CryptContext
-from jose import jwt
 
 log = logging.getLogger("alize.security")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Coût bcrypt configurable : 12 en production, abaissable en dev/test où
+# les ~100 ms par hash ne protègent rien.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+)
 
 # JWT Configuration - MUST be set in production
 _jwt_secret = os.getenv("JWT_SECRET")
@@ -23,14 +33,48 @@ JWT_EXPIRES_MIN = int(os.getenv("JWT_EXPIRES_MIN", "10080"))  # 7 jours
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
+# Cache court des vérifications réussies : le motif « même utilisateur,
+# même mot de passe, appels répétés » (re-login, re-auth) ne repaie pas
+# le bcrypt complet pendant 60 s. Le mot de passe n'est jamais stocké :
+# la clé est un HMAC salé par le secret serveur. Les échecs ne sont pas
+# mis en cache — chaque tentative ratée garde le coût bcrypt entier.
+_VERIFY_TTL = 60.0
+_VERIFY_MAX = 1024
+_verify_cache: "OrderedDict[tuple[bytes, str], float]" = OrderedDict()
+
+
 def verify_password(password: str, password_hash: str) -> bool:
-    return pwd_context.verify(password, password_hash)
+    key = (hmac.new(_JWT_KEY, password.encode(), hashlib.sha256).digest(), password_hash)
+    expires = _verify_cache.get(key)
+    if expires is not None and expires > time.monotonic():
+        _verify_cache.move_to_end(key)
+        return True
+    ok = pwd_context.verify(password, password_hash)
+    if ok:
+        _verify_cache[key] = time.monotonic() + _VERIFY_TTL
+        while len(_verify_cache) > _VERIFY_MAX:
+            _verify_cache.popitem(last=False)
+    return ok
+
+# Émission HS256 à la main : l'en-tête (constant) est encodé une fois à
+# l'import et la clé est pré-chargée en bytes, au lieu de laisser jose
+# reconstruire en-tête, clé et sérialisation JSON à chaque login. La
+# vérification des tokens reste faite par jose dans app.auth.
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(
+    json.dumps({"alg": JWT_ALG, "typ": "JWT"}, separators=(",", ":")).encode()
+).rstrip(b"=")
+_JWT_KEY = JWT_SECRET.encode()
+_JWT_EXPIRES_S = JWT_EXPIRES_MIN * 60
+
 
 def create_access_token(user_id: int) -> str:
-    now = datetime.now(timezone.utc)
-    payload = {
-        "sub": str(user_id),
-        "iat": int(now.timestamp()),
-        "exp": int((now + timedelta(minutes=JWT_EXPIRES_MIN)).timestamp()),
-    }
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
+    now = int(time.time())
+    payload = {"sub": str(user_id), "iat": now, "exp": now + _JWT_EXPIRES_S}
+    payload_b64 = base64.urlsafe_b64encode(
+        json.dumps(payload, separators=(",", ":")).encode()
+    ).rstrip(b"=")
+    signing_input = _JWT_HEADER_B64 + b"." + payload_b64
+    sig = base64.urlsafe_b64encode(
+        hmac.new(_JWT_KEY, signing_input, hashlib.sha256).digest()
+    ).rstrip(b"=")
+    return (signing_input + b"." + sig).decode()
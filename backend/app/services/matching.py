@@ -1,25 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Literal
-from urllib import request as urlrequest, error as urlerror
-from collections import Counter
+from collections import Counter, OrderedDict
+from operator import itemgetter
 import re
+import time
 
-from sqlalchemy.orm import Session
+import httpx
+
+from sqlalchemy import case
+from sqlalchemy.orm import Session, undefer
 from sqlalchemy.exc import IntegrityError
 
 from app.models import (
     CV,
     JobListing,
+    JobListingBody,
     UserPreference,
     UserJob,
+    job_is_remote,
+    job_url_hash,
 )
 from app.schemas import JobOut
 
 NEW_BADGE_DAYS = 3
 OLD_JOB_DAYS = 90  # Auto-delete jobs older than 90 days
 
-# Common French/English stop words to ignore in CV analysis
-STOP_WORDS = {
+# Common French/English stop words to ignore in CV analysis.
+# frozenset : table de hachage figée au chargement du module, membership
+# O(1) sans risque de mutation accidentelle dans le chemin chaud.
+STOP_WORDS = frozenset({
     # French
     "le", "la", "les", "de", "du", "des", "un", "une", "et", "en", "est", "sont",
     "pour", "dans", "sur", "avec", "par", "aux", "qui", "que", "cette", "ces",
@@ -38,6 +49,17 @@ STOP_WORDS = {
     "travail", "work", "job", "poste", "mission", "missions", "projet", "projets",
     "project", "projects", "team", "équipe", "client", "clients", "company",
     "entreprise", "société", "gestion", "management", "développement", "development",
+})
+
+# Variantes par type de contrat, construites une fois : score_job fait un
+# .get(ctx.contract) direct au lieu de reconstruire le dict et de le
+# parcourir à chaque offre.
+_CONTRACT_VARIANTS: dict[str, tuple[str, ...]] = {
+    "cdi": ("cdi", "permanent", "indéterminée", "contrat indéterminé"),
+    "cdd": ("cdd", "déterminée", "temporary", "contrat déterminé"),
+    "stage": ("stage", "internship", "intern", "stagiaire"),
+    "alternance": ("alternance", "apprentissage", "apprenticeship", "apprenti"),
+    "freelance": ("freelance", "indépendant", "contractor", "mission"),
 }
 
 
@@ -47,15 +69,30 @@ def norm_list(raw: Optional[str]) -> list[str]:
     return [item.strip().lower() for item in raw.split(",") if item.strip()]
 
 
+def _job_search_text(job: JobListing) -> tuple[str, str, str, str]:
+    """(texte complet, titre, localisation, description) en minuscules.
+
+    Calculé une fois et mémorisé sur l'instance ORM : score_job,
+    _extract_match_reasons et le calcul is_remote relisaient chacun les
+    mêmes colonnes en refaisant les .lower() et la concaténation.
+    """
+    cached = getattr(job, "_lowered", None)
+    if cached is None:
+        title_l = job.title.lower()
+        loc_l = (job.location or "").lower()
+        desc_l = (job.description or "").lower()
+        text = f"{title_l} {job.company.lower()} {loc_l} {desc_l}"
+        cached = job._lowered = (text, title_l, loc_l, desc_l)
+    return cached
+
+
 def _extract_match_reasons(
     job: JobListing,
     pref: UserPreference,
     user_cv: set[str],
     max_items: int = 4,
 ) -> list[str]:
-    text = f"{job.title} {job.company} {job.location or ''} {job.description or ''}".lower()
-    title_lower = job.title.lower()
-    location_lower = (job.location or "").lower()
+    text, title_lower, location_lower, _ = _job_search_text(job)
     reasons: list[str] = []
 
     role = (pref.role or "").strip()
@@ -83,37 +120,176 @@ def _extract_match_reasons(
     return reasons[:max_items]
 
 
-def cv_keywords(db: Session, user_id: int) -> set[str]:
-    """Extract relevant keywords from CV using frequency analysis."""
-    cv = (
-        db.query(CV)
+# Keep alphanumeric and common tech characters (., +, #, ++) — compilé
+# une fois au lieu de repasser par le cache regex à chaque CV. Le motif
+# encode directement « commence par un non-chiffre » et « longueur ≥ 3 » :
+# les nombres purs et tokens courts sont écartés par le moteur C, il ne
+# reste que le filtre STOP_WORDS côté Python.
+_CV_TOKEN_RE = re.compile(r'[a-zàâäéèêëïîôùûüç#+.][a-zàâäéèêëïîôùûüç0-9#+.]{2,}')
+
+# Mots-clés par (user, cv) : un CV est immuable une fois uploadé (nouvel
+# upload = nouvelle ligne), donc le résultat est stable et les requêtes
+# répétées du dashboard ne re-tokenisent pas un texte de plusieurs Ko —
+# ni ne le rechargent depuis la base.
+_CV_KW_CACHE_MAX = 1024
+_cv_kw_cache: "OrderedDict[tuple[int, int], frozenset[str]]" = OrderedDict()
+
+
+def _compute_cv_keywords(text: str) -> frozenset[str]:
+    """Extract relevant keywords from CV text using frequency analysis."""
+    # Clean and tokenize text
+    tokens = _CV_TOKEN_RE.findall(text.lower())
+
+    # Filter tokens — générateur consommé directement par Counter, pas de
+    # liste intermédiaire de dizaines de milliers de tokens. Longueur et
+    # chiffres sont déjà exclus par le motif de _CV_TOKEN_RE ; le strip()
+    # écarte ce qui ne contient aucune lettre ('+++', '.55', ...) : un tel
+    # token, composé uniquement de ces caractères, se réduit à vide.
+    filtered = (
+        t for t in tokens if t not in STOP_WORDS and t.strip("#+.0123456789")
+    )
+
+    # Count frequency and get most common (top 40 most frequent)
+    return frozenset(map(itemgetter(0), Counter(filtered).most_common(40)))
+
+
+def cv_keywords(db: Session, user_id: int) -> frozenset[str]:
+    """Mots-clés du dernier CV de l'utilisateur, sans retokenisation.
+
+    Lit la colonne keywords_cached (remplie à l'upload) ; si elle est NULL
+    (CV d'avant la colonne), recalcule depuis le texte et backfille la ligne.
+    """
+    row = (
+        db.query(CV.id, CV.keywords_cached)
         .filter(CV.user_id == user_id)
         .order_by(CV.id.desc())
         .first()
     )
-    if not cv or not cv.text:
-        return set()
+    if not row:
+        return frozenset()
+
+    cv_id, cached_col = row
+    key = (user_id, cv_id)
+    cached = _cv_kw_cache.get(key)
+    if cached is not None:
+        _cv_kw_cache.move_to_end(key)
+        return cached
+
+    if cached_col is not None:
+        keywords = frozenset(cached_col.split(",")) if cached_col else frozenset()
+    else:
+        text = db.query(CV.text).filter(CV.id == cv_id).scalar()
+        if not text:
+            return frozenset()
+        keywords = _compute_cv_keywords(text)
+        # Backfill paresseux : les prochains appels (tous workers confondus)
+        # liront la colonne sans recharger le texte. L'UPDATE reste en
+        # attente dans la transaction de l'appelant — pas de commit ici,
+        # qui validerait aussi son travail en cours à mi-parcours.
+        db.query(CV).filter(CV.id == cv_id).update(
+            {CV.keywords_cached: ",".join(sorted(keywords))},
+            synchronize_session=False,
+        )
 
-    # Clean and tokenize text
-    text = cv.text.lower()
-    # Keep alphanumeric and common tech characters (., +, #, ++)
-    tokens = re.findall(r'[a-zàâäéèêëïîôùûüç0-9#+.]+', text)
-
-    # Filter tokens
-    filtered = [
-        t for t in tokens
-        if len(t) > 2
-        and t not in STOP_WORDS
-        and not t.isdigit()  # Exclude pure numbers
-    ]
+    _cv_kw_cache[key] = keywords
+    while len(_cv_kw_cache) > _CV_KW_CACHE_MAX:
+        _cv_kw_cache.popitem(last=False)
+    return keywords
 
-    # Count frequency and get most common
-    counter = Counter(filtered)
-    # Return top 40 most frequent relevant words
-    return set(word for word, _ in counter.most_common(40))
 
+@dataclass(frozen=True, slots=True)
+class ScoringCtx:
+    """Préférences normalisées une fois par lot d'offres.
 
-def score_job(job: JobListing, pref: UserPreference, user_cv: set[str]) -> Optional[int]:
+    score_job refaisait norm_list/lower/split sur les mêmes colonnes de
+    UserPreference pour chaque offre scorée ; tout le parsing est hoisté
+    ici et le contexte immuable est partagé par la boucle entière.
+    """
+
+    must: tuple[str, ...]
+    avoid: tuple[str, ...]
+    role: str
+    role_words: tuple[str, ...]
+    loc: str
+    loc_words: tuple[str, ...]
+    remote_wanted: bool
+    contract: str
+    salary_floor: Optional[int]
+    cv_kw: tuple[str, ...]
+    has_preferences: bool
+    # Passe unique multi-motifs sur must ∪ avoid ∪ cv, compilée une fois
+    # par lot ; None quand un conflit de préfixes la rendrait inexacte.
+    kw_pattern: Optional["re.Pattern[str]"]
+
+    @classmethod
+    def build(cls, pref: UserPreference, user_cv: set[str]) -> "ScoringCtx":
+        must = tuple(norm_list(pref.must_keywords))
+        avoid = tuple(norm_list(pref.avoid_keywords))
+        role = (pref.role or "").lower().strip()
+        loc = (pref.location or "").lower().strip()
+        contract = (pref.contract_type or "").lower().strip()
+        return cls(
+            must=must,
+            avoid=avoid,
+            role=role,
+            role_words=tuple(w for w in role.split() if len(w) > 3),
+            loc=loc,
+            loc_words=tuple(w.strip() for w in loc.split(",") if w.strip()),
+            remote_wanted=any(t in loc for t in ("remote", "télétravail", "hybride")),
+            contract=contract,
+            salary_floor=pref.salary_min,
+            cv_kw=tuple(user_cv),
+            has_preferences=bool(role or loc or must or contract),
+            kw_pattern=_compile_keyword_pattern(set(must) | set(avoid) | set(user_cv)),
+        )
+
+    def keyword_hits(self, text: str) -> tuple[bool, int, int]:
+        """(avoid touché, nb de must présents, nb de mots-clés CV présents).
+
+        Avec le motif compilé : un seul balayage du texte au lieu d'un
+        scan de sous-chaîne par mot-clé. Sinon, les boucles `in` d'origine,
+        avec court-circuit dès qu'un avoid est trouvé.
+        """
+        if self.kw_pattern is not None:
+            found = {m.group(1) for m in self.kw_pattern.finditer(text)}
+            if self.avoid and not found.isdisjoint(self.avoid):
+                return True, 0, 0
+            return (
+                False,
+                sum(1 for k in self.must if k in found),
+                sum(1 for k in self.cv_kw if k in found),
+            )
+        if self.avoid and any(k in text for k in self.avoid):
+            return True, 0, 0
+        return (
+            False,
+            sum(1 for k in self.must if k in text),
+            sum(1 for k in self.cv_kw if k in text),
+        )
+
+
+# Au-delà de ce nombre de mots-clés, la passe unique bat les scans
+# mémchr successifs ; en dessous, `in` reste imbattable.
+_KW_PATTERN_MIN = 10
+
+
+def _compile_keyword_pattern(keywords: set[str]) -> Optional["re.Pattern[str]"]:
+    """Alternation (?=(k1|k2|...)) : capture chaque mot-clé débutant à
+    chaque position, donc les chevauchements entre mots-clés distincts ne
+    masquent rien. Seul cas inexact : un mot-clé préfixe d'un autre (les
+    deux partent de la même position, une seule alternative capture) —
+    on renonce alors à la passe unique plutôt que de perdre des hits."""
+    keywords.discard("")
+    if len(keywords) < _KW_PATTERN_MIN:
+        return None
+    ordered = sorted(keywords, key=len)
+    for i, kw in enumerate(ordered):
+        if any(other.startswith(kw) for other in ordered[i + 1:]):
+            return None
+    return re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+
+
+def score_job(job: JobListing, ctx: ScoringCtx) -> Optional[int]:
     """
     Score a job from 0-100 based on user preferences and CV.
     Returns None if job should be filtered out.
@@ -123,57 +299,45 @@ def score_job(job: JobListing, pref: UserPreference, user_cv: set[str]) -> Optio
     - Base score starts higher (40) to avoid all jobs being 2/10
     - Bonuses for matches, minimal penalties for non-matches when preferences are empty
     """
-    text = f"{job.title} {job.company} {job.location or ''} {job.description or ''}".lower()
-    title_lower = job.title.lower()
-    location_lower = (job.location or "").lower()
+    text, title_lower, location_lower, _ = _job_search_text(job)
 
-    must = norm_list(pref.must_keywords)
-    avoid = norm_list(pref.avoid_keywords)
-    role = (pref.role or "").lower().strip()
-    loc = (pref.location or "").lower().strip()
-    contract_pref = (pref.contract_type or "").lower().strip()
-    salary_floor = pref.salary_min
+    # Une passe sur le texte pour avoid + must + CV (cf. ScoringCtx)
+    avoid_hit, must_hits, cv_matches = ctx.keyword_hits(text)
 
     # Hard filters - return None to exclude
-    if avoid and any(k in text for k in avoid):
+    if avoid_hit:
         return None
 
-    if salary_floor:
-        if job.salary_min is not None and job.salary_min < salary_floor:
+    if ctx.salary_floor:
+        if job.salary_min is not None and job.salary_min < ctx.salary_floor:
             return None
 
-    # Check if user has defined meaningful preferences
-    has_preferences = bool(role or loc or must or contract_pref)
-
     # Start with base score - higher if no preferences (neutral starting point)
-    score = 35 if has_preferences else 50
+    score = 35 if ctx.has_preferences else 50
 
     # === Role matching (up to +25) ===
-    if role:
-        if role in title_lower:
+    if ctx.role:
+        if ctx.role in title_lower:
             score += 25  # Exact role in title = strong match
-        elif any(word in title_lower for word in role.split() if len(word) > 3):
+        elif any(word in title_lower for word in ctx.role_words):
             score += 15  # Partial role match
         else:
             score -= 5  # Role specified but not found = small penalty
 
     # === Location matching (up to +15) ===
-    if loc:
-        loc_words = [w.strip() for w in loc.split(",")]
-        location_match = any(word in location_lower for word in loc_words if word)
-        remote_wanted = any(term in loc.lower() for term in ["remote", "télétravail", "hybride"])
+    if ctx.loc:
+        location_match = any(word in location_lower for word in ctx.loc_words)
         remote_offered = "remote" in text or "télétravail" in text or "hybride" in text
 
         if location_match:
             score += 15  # Location matches
-        elif remote_wanted and remote_offered:
+        elif ctx.remote_wanted and remote_offered:
             score += 12  # Remote wanted and offered
         # No penalty if location doesn't match - user might be flexible
 
     # === Must keywords (up to +20) ===
-    if must:
-        must_hits = sum(1 for k in must if k in text)
-        must_ratio = must_hits / len(must) if must else 0
+    if ctx.must:
+        must_ratio = must_hits / len(ctx.must)
         if must_ratio >= 0.8:
             score += 20  # Most must keywords found
         elif must_ratio >= 0.5:
@@ -184,31 +348,21 @@ def score_job(job: JobListing, pref: UserPreference, user_cv: set[str]) -> Optio
             score -= 5  # None of the must keywords found = small penalty
 
     # === Contract type (up to +10) ===
-    if contract_pref:
-        if contract_pref in text:
+    if ctx.contract:
+        if ctx.contract in text:
             score += 10
         else:
             # Check common variations
-            contract_map = {
-                "cdi": ["cdi", "permanent", "indéterminée", "contrat indéterminé"],
-                "cdd": ["cdd", "déterminée", "temporary", "contrat déterminé"],
-                "stage": ["stage", "internship", "intern", "stagiaire"],
-                "alternance": ["alternance", "apprentissage", "apprenticeship", "apprenti"],
-                "freelance": ["freelance", "indépendant", "contractor", "mission"],
-            }
-            for key, variants in contract_map.items():
-                if contract_pref == key and any(v in text for v in variants):
-                    score += 10
-                    break
+            variants = _CONTRACT_VARIANTS.get(ctx.contract)
+            if variants and any(v in text for v in variants):
+                score += 10
 
     # === CV keywords matching (up to +30 when no preferences, +20 otherwise) ===
-    if user_cv:
-        # Check how many CV keywords appear in job description
-        cv_matches = sum(1 for kw in user_cv if kw in text)
-        match_ratio = cv_matches / len(user_cv) if user_cv else 0
+    if ctx.cv_kw:
+        match_ratio = cv_matches / len(ctx.cv_kw)
 
         # Give more weight to CV matching when no preferences are defined
-        cv_bonus_max = 30 if not has_preferences else 20
+        cv_bonus_max = 30 if not ctx.has_preferences else 20
 
         if match_ratio >= 0.35:
             score += cv_bonus_max  # Strong CV match
@@ -245,6 +399,7 @@ def clear_all_jobs(db: Session):
     """
     # Delete dependent records first to avoid FK violations
     db.query(UserJob).delete()
+    db.query(JobListingBody).delete()
     db.query(JobListing).delete()
     db.commit()
 
@@ -255,8 +410,6 @@ def clear_user_job_data(db: Session, user_id: int):
     This resets the user's job list so they can start fresh.
     Also deletes jobs that are no longer referenced by any user.
     """
-    from sqlalchemy import func
-
     # Get job IDs associated with this user before deleting
     user_job_ids = [
         row[0]
@@ -264,24 +417,155 @@ def clear_user_job_data(db: Session, user_id: int):
     ]
 
     # Delete user_jobs entries
-    db.query(UserJob).filter(UserJob.user_id == user_id).delete()
-    db.commit()
+    db.query(UserJob).filter(UserJob.user_id == user_id).delete(synchronize_session=False)
 
-    # Delete orphaned jobs in a single query
+    # Anti-jointure : une offre de la liste est orpheline si plus aucun
+    # user_jobs ne la référence. Le NOT EXISTS corrélé remplace le second
+    # SELECT DISTINCT + différence d'ensembles côté Python.
     if user_job_ids:
-        # Find jobs that are still referenced by other users
-        referenced_job_ids = {
-            row[0]
-            for row in db.query(UserJob.job_id)
-            .filter(UserJob.job_id.in_(user_job_ids))
-            .distinct()
-            .all()
+        still_referenced = (
+            db.query(UserJob.id)
+            .filter(UserJob.job_id == JobListing.id)
+            .exists()
+        )
+        orphaned = db.query(JobListing.id).filter(
+            JobListing.id.in_(user_job_ids), ~still_referenced
+        ).scalar_subquery()
+        db.query(JobListingBody).filter(JobListingBody.job_id.in_(orphaned)).delete(synchronize_session=False)
+        db.query(JobListing).filter(
+            JobListing.id.in_(user_job_ids), ~still_referenced
+        ).delete(synchronize_session=False)
+
+    db.commit()
+
+
+_JOB_LISTING_COLS = ("source", "title", "company", "location", "url", "description", "salary_min")
+
+
+def bulk_upsert_job_listings(db: Session, rows: list[dict]) -> int:
+    """
+    Insertion en masse d'offres avec dédoublonnage par URL.
+
+    `rows` : dicts avec les clés de _JOB_LISTING_COLS. Un seul INSERT ...
+    ON CONFLICT (url) DO NOTHING remplace la boucle add() par ligne, et les
+    corps d'offres partent dans job_listing_bodies via le fast path
+    insertmanyvalues. Retourne le nombre de lignes réellement insérées.
+    """
+    if not rows:
+        return 0
+
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    values = [
+        {
+            **{col: r.get(col) for col in _JOB_LISTING_COLS},
+            "url_hash": job_url_hash(r["url"]),
+            "is_remote": job_is_remote(r.get("location"), r.get("description")),
         }
-        # Delete jobs that have no references
-        orphaned_ids = set(user_job_ids) - referenced_job_ids
-        if orphaned_ids:
-            db.query(JobListing).filter(JobListing.id.in_(orphaned_ids)).delete(synchronize_session=False)
-            db.commit()
+        for r in rows
+    ]
+    stmt = (
+        dialect_insert(JobListing)
+        .values(values)
+        .on_conflict_do_nothing(index_elements=["url_hash"])
+        .returning(JobListing.id, JobListing.url)
+    )
+    inserted = db.execute(stmt).all()
+
+    if inserted:
+        desc_by_url = {r["url"]: r.get("description") for r in rows}
+        from sqlalchemy import insert as core_insert
+
+        db.execute(
+            core_insert(JobListingBody),
+            [{"job_id": job_id, "description": desc_by_url.get(url)} for job_id, url in inserted],
+        )
+
+    db.commit()
+    return len(inserted)
+
+
+# En dessous de ce volume, les INSERT batchés suffisent ; au-delà, COPY
+# évite le coût parse/plan/WAL par statement.
+BULK_COPY_THRESHOLD = 500
+
+
+def bulk_copy_job_listings(db: Session, rows: list[dict]) -> int:
+    """
+    Variante COPY de bulk_upsert_job_listings pour les gros backfills.
+
+    Postgres uniquement : COPY vers une table temporaire puis
+    INSERT ... SELECT ... ON CONFLICT (url) DO NOTHING pour le
+    dédoublonnage. Les petits lots et SQLite repassent par l'upsert batché.
+    """
+    if len(rows) < BULK_COPY_THRESHOLD or db.get_bind().dialect.name != "postgresql":
+        return bulk_upsert_job_listings(db, rows)
+
+    import csv
+    import io
+
+    from sqlalchemy import text as sa_text
+
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter="\t", lineterminator="\n")
+    for r in rows:
+        # le hash transite en hex (COPY texte), décodé côté serveur
+        writer.writerow(
+            [r"\N" if r.get(col) is None else r.get(col) for col in _JOB_LISTING_COLS]
+            + [
+                job_url_hash(r["url"]).hex(),
+                "t" if job_is_remote(r.get("location"), r.get("description")) else "f",
+            ]
+        )
+    buf.seek(0)
+
+    db.execute(
+        sa_text(
+            "CREATE TEMP TABLE tmp_job_ingest ("
+            "source text, title text, company text, location text, "
+            "url text, description text, salary_min integer, url_hash_hex text, "
+            "is_remote boolean"
+            ") ON COMMIT DROP"
+        )
+    )
+
+    # copy_expert passe par la connexion DBAPI sous-jacente, dans la même
+    # transaction que la session.
+    raw_cursor = db.connection().connection.cursor()
+    try:
+        raw_cursor.copy_expert(
+            "COPY tmp_job_ingest (source, title, company, location, url, description, salary_min, url_hash_hex, is_remote) "
+            "FROM STDIN WITH (FORMAT csv, DELIMITER E'\\t', NULL '\\N')",
+            buf,
+        )
+    finally:
+        raw_cursor.close()
+
+    inserted = db.execute(
+        sa_text(
+            "INSERT INTO job_listings (source, title, company, location, url, description, salary_min, url_hash, is_remote) "
+            "SELECT DISTINCT ON (url_hash_hex) source, title, company, location, url, description, salary_min, "
+            "decode(url_hash_hex, 'hex'), is_remote "
+            "FROM tmp_job_ingest "
+            "ON CONFLICT (url_hash) DO NOTHING "
+            "RETURNING id, url"
+        )
+    ).all()
+
+    if inserted:
+        desc_by_url = {r["url"]: r.get("description") for r in rows}
+        from sqlalchemy import insert as core_insert
+
+        db.execute(
+            core_insert(JobListingBody),
+            [{"job_id": job_id, "description": desc_by_url.get(url)} for job_id, url in inserted],
+        )
+
+    db.commit()
+    return len(inserted)
 
 
 def cleanup_old_jobs(db: Session) -> int:
@@ -292,50 +576,93 @@ def cleanup_old_jobs(db: Session) -> int:
     """
     cutoff = datetime.now(timezone.utc) - timedelta(days=OLD_JOB_DAYS)
 
-    # Get IDs of old jobs for bulk operations
-    old_job_ids = [
-        row[0]
-        for row in db.query(JobListing.id).filter(JobListing.created_at < cutoff).all()
-    ]
-
-    if not old_job_ids:
-        return 0
+    # Sous-requête plutôt qu'une liste d'ids matérialisée en Python : les
+    # DELETE s'exécutent entièrement côté base, sans rapatrier ni resérialiser
+    # potentiellement des milliers d'identifiants.
+    old_job_ids = (
+        db.query(JobListing.id)
+        .filter(JobListing.created_at < cutoff)
+        .scalar_subquery()
+    )
 
     # Delete related user_jobs first (bulk delete for performance)
     db.query(UserJob).filter(UserJob.job_id.in_(old_job_ids)).delete(synchronize_session=False)
+    db.query(JobListingBody).filter(JobListingBody.job_id.in_(old_job_ids)).delete(synchronize_session=False)
 
     # Now bulk delete the jobs themselves
-    count = db.query(JobListing).filter(JobListing.id.in_(old_job_ids)).delete(synchronize_session=False)
+    count = db.query(JobListing).filter(JobListing.created_at < cutoff).delete(synchronize_session=False)
 
     db.commit()
     return count
 
 
+# Résultats de vérification d'URL gardés 6 h : une offre re-vérifiée
+# d'une page à l'autre ne repaie pas le HEAD de 3 s.
+_URL_ALIVE_TTL = 6 * 3600
+_URL_ALIVE_MAX = 4096
+_url_alive_cache: "OrderedDict[str, tuple[float, bool]]" = OrderedDict()
+
+
 def is_job_url_alive(url: str, timeout: float = 3.0) -> bool:
+    """Vérifie si une offre est encore en ligne, avec cache TTL en mémoire."""
+    entry = _url_alive_cache.get(url)
+    if entry is not None and entry[0] > time.monotonic():
+        _url_alive_cache.move_to_end(url)
+        return entry[1]
+    alive = _probe_job_url(url, timeout)
+    _url_alive_cache[url] = (time.monotonic() + _URL_ALIVE_TTL, alive)
+    while len(_url_alive_cache) > _URL_ALIVE_MAX:
+        _url_alive_cache.popitem(last=False)
+    return alive
+
+
+def check_job_urls_alive(
+    urls: list[str], timeout: float = 3.0, max_workers: int = 32
+) -> dict[str, bool]:
+    """Vérifie un lot d'URLs en parallèle.
+
+    Chaque sonde coûte jusqu'à `timeout` secondes de pure attente réseau :
+    en série un lot de 50 URLs bloque plusieurs minutes, avec le pool le
+    lot entier coûte environ un aller-retour. Les hits du cache TTL ne
+    paient même pas le passage par le pool.
+    """
+    unique = list(dict.fromkeys(urls))
+    if not unique:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as ex:
+        return dict(zip(unique, ex.map(lambda u: is_job_url_alive(u, timeout), unique)))
+
+
+# Client persistant partagé par les sondes : urllib rouvrait une
+# connexion TCP + TLS par URL vérifiée ; ici le keep-alive amortit le
+# handshake à un par hôte, y compris à travers le pool de threads
+# (httpx.Client est thread-safe).
+_HTTP_PROBE = httpx.Client(
+    timeout=3.0,
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+)
+
+
+def _probe_job_url(url: str, timeout: float) -> bool:
     """
     Vérifie si une offre est encore en ligne.
     On tente un HEAD rapide, avec fallback GET léger si HEAD est refusé.
     """
-    req = urlrequest.Request(url, method="HEAD")
     try:
-        with urlrequest.urlopen(req, timeout=timeout):  # nosec - URL externe contrôlée par DB
-            return True
-    except urlerror.HTTPError as exc:
-        if exc.code in (404, 410):
-            return False
-        if exc.code in (405, 403):
-            # Certains sites refusent HEAD : on tente un GET minimal
-            try:
-                req_get = urlrequest.Request(url, method="GET", headers={"Range": "bytes=0-0"})
-                with urlrequest.urlopen(req_get, timeout=timeout):  # nosec
-                    return True
-            except urlerror.HTTPError as exc_get:
-                return exc_get.code not in (404, 410)
-            except Exception:
-                return False
-        return True
-    except Exception:
+        resp = _HTTP_PROBE.head(url, timeout=timeout)  # nosec - URL externe contrôlée par DB
+    except httpx.HTTPError:
         return False
+    if resp.status_code in (404, 410):
+        return False
+    if resp.status_code in (405, 403):
+        # Certains sites refusent HEAD : on tente un GET minimal
+        try:
+            resp_get = _HTTP_PROBE.get(url, headers={"Range": "bytes=0-0"}, timeout=timeout)  # nosec
+        except httpx.HTTPError:
+            return False
+        return resp_get.status_code not in (404, 410)
+    return True
 
 
 def _normalize_created_at(created_at: Optional[datetime]) -> Optional[datetime]:
@@ -344,19 +671,34 @@ def _normalize_created_at(created_at: Optional[datetime]) -> Optional[datetime]:
     return created_at
 
 
-def _job_to_jobout(job: JobListing, pref: UserPreference, user_cv: set[str]) -> Optional[JobOut]:
-    score = score_job(job, pref, user_cv)
+# Alloué une fois : évite un timedelta par offre dans les boucles
+_NEW_BADGE_DELTA = timedelta(days=NEW_BADGE_DAYS)
+
+
+def _job_to_jobout(
+    job: JobListing,
+    pref: UserPreference,
+    user_cv: set[str],
+    new_cutoff: Optional[datetime] = None,
+) -> Optional[JobOut]:
+    score = score_job(job, ScoringCtx.build(pref, user_cv))
     if score is None:
         return None
     score_10 = max(0, min(10, round(score / 10)))
     created_at = _normalize_created_at(job.created_at)
-    is_new = False
-    if created_at:
-        delta = datetime.now(timezone.utc) - created_at
-        is_new = delta <= timedelta(days=NEW_BADGE_DAYS)
-    is_remote = "remote" in (job.location or "").lower() or "remote" in (job.description or "").lower()
+    # Les appels en lot passent un seuil calculé une fois ; comparaison
+    # directe plutôt qu'une soustraction + timedelta par offre.
+    if new_cutoff is None:
+        new_cutoff = datetime.now(timezone.utc) - _NEW_BADGE_DELTA
+    is_new = created_at is not None and created_at >= new_cutoff
+    is_remote = job.is_remote
+    if is_remote is None:  # lignes d'avant la colonne calculée
+        _, _, loc_l, desc_l = _job_search_text(job)
+        is_remote = "remote" in loc_l or "remote" in desc_l
     match_reasons = _extract_match_reasons(job, pref, user_cv)
-    return JobOut(
+    # model_construct : les champs viennent de la base, déjà typés par
+    # l'ORM — aucune entrée non fiable à re-valider ici.
+    return JobOut.model_construct(
         id=job.id,
         source=job.source,
         title=job.title,
@@ -386,25 +728,46 @@ def list_matches_for_user(
     page_size: Optional[int] = None,
     sort_by: SortOption = "new_first",
 ) -> list[JobOut]:
-    """Liste les offres de l'utilisateur depuis UserJob (dashboard simplifié)."""
-    # Get user's jobs that are not deleted, joined with job listings
-    user_jobs = (
+    """Liste les offres de l'utilisateur depuis UserJob (dashboard simplifié).
+
+    Tri et pagination côté SQL : seule la page demandée est chargée et
+    convertie en JobOut, au lieu de matérialiser puis trier toutes les
+    offres de l'utilisateur en Python à chaque appel. Les ORDER BY
+    s'appuient sur ix_user_job_user_status et les index created_at.
+    """
+    query = (
         db.query(UserJob, JobListing)
         .join(JobListing, UserJob.job_id == JobListing.id)
+        .options(undefer(JobListing.description))
         .filter(UserJob.user_id == user_id)
         .filter(UserJob.status != "deleted")
-        .order_by(UserJob.created_at.desc())
-        .all()
     )
 
+    if sort_by == "newest":
+        query = query.order_by(JobListing.created_at.desc().nullslast())
+    elif sort_by == "score":
+        query = query.order_by(UserJob.score.desc().nullslast())
+    else:  # "new_first"
+        query = query.order_by(
+            case((UserJob.status == "new", 0), else_=1),
+            UserJob.score.desc().nullslast(),
+            JobListing.created_at.desc().nullslast(),
+        )
+
+    if page and page_size:
+        query = query.offset(max(0, (page - 1) * page_size)).limit(page_size)
+
     result = []
-    for user_job, job in user_jobs:
+    for user_job, job in query.all():
         created_at = _normalize_created_at(job.created_at)
         is_new = user_job.status == "new"
-        is_remote = "remote" in (job.location or "").lower() or "remote" in (job.description or "").lower()
+        is_remote = job.is_remote
+        if is_remote is None:  # lignes d'avant la colonne calculée
+            _, _, loc_l, desc_l = _job_search_text(job)
+            is_remote = "remote" in loc_l or "remote" in desc_l
         match_reasons = _extract_match_reasons(job, pref, user_cv)
 
-        job_out = JobOut(
+        job_out = JobOut.model_construct(
             id=job.id,
             source=job.source,
             title=job.title,
@@ -423,23 +786,6 @@ def list_matches_for_user(
         )
         result.append(job_out)
 
-    # Sort based on option
-    if sort_by == "newest":
-        result.sort(key=lambda j: j.created_at or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
-    elif sort_by == "score":
-        result.sort(key=lambda j: j.score or 0, reverse=True)
-    else:  # "new_first"
-        result.sort(key=lambda j: (
-            0 if j.is_new else 1,
-            -(j.score or 0),
-            -(j.created_at or datetime.min.replace(tzinfo=timezone.utc)).timestamp()
-        ))
-
-    if page and page_size:
-        start = max(0, (page - 1) * page_size)
-        end = start + page_size
-        return result[start:end]
-
     return result
 
 
@@ -452,6 +798,7 @@ def add_jobs_to_user_dashboard(
 ) -> int:
     """Ajoute des offres au dashboard de l'utilisateur avec leur score."""
     added = 0
+    ctx = ScoringCtx.build(pref, user_cv)
     seen_job_ids: set[int] = set()  # Track jobs added in this batch
 
     for job in jobs:
@@ -470,7 +817,7 @@ def add_jobs_to_user_dashboard(
             continue
 
         # Calculer le score
-        score = score_job(job, pref, user_cv)
+        score = score_job(job, ctx)
         if score is None:
             continue  # Job filtré par les critères
 
@@ -503,7 +850,7 @@ def add_jobs_to_user_dashboard(
                 )
                 if existing:
                     continue
-                score = score_job(job, pref, user_cv)
+                score = score_job(job, ctx)
                 if score is None:
                     continue
                 score_10 = max(0, min(10, round(score / 10)))
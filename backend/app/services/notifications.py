@@ -677,10 +677,10 @@ def notify_all_users(db: Session, matches_func, refresh: bool = False):
                     run_entry = JobSearchRun(
                         user_id=user.id,
                         inserted=result.get("inserted", 0),
-                        tried_queries=json.dumps(result.get("tried_queries", [])),
-                        sources=json.dumps(result.get("sources", {})),
+                        tried_queries=result.get("tried_queries", []),
+                        sources=result.get("sources", {}),
                         created_at=now,
-                        analysis_json=json.dumps(result.get("analysis", {})),
+                        analysis_json=result.get("analysis", {}),
                     )
                     db.add(run_entry)
 
@@ -704,12 +704,12 @@ def notify_all_users(db: Session, matches_func, refresh: bool = False):
                     # Mise en cache de l'analyse
                     cache = db.query(UserAnalysisCache).filter(UserAnalysisCache.user_id == user.id).first()
                     if cache:
-                        cache.analysis_json = json.dumps(result.get("analysis", {}))
+                        cache.analysis_json = result.get("analysis", {})
                         cache.updated_at = now
                     else:
                         db.add(UserAnalysisCache(
                             user_id=user.id,
-                            analysis_json=json.dumps(result.get("analysis", {})),
+                            analysis_json=result.get("analysis", {}),
                             updated_at=now
                         ))
 
@@ -9,23 +9,41 @@ from fastapi.openapi.docs import get_swagger_ui_html, get_swagger_ui_oauth2_redi
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
+# Pré-encodés une fois : ajoutés au message http.response.start de chaque
+# réponse sans repasser par l'objet Response.
+_SECURITY_HEADERS = [
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"permissions-policy", b"geolocation=(), microphone=(), camera=()"),
+]
+
+
+class SecurityHeadersMiddleware:
+    """Add security headers to all responses.
+
+    ASGI pur : BaseHTTPMiddleware crée un générateur async + une queue
+    mémoire par requête, payés sur toutes les routes de l'app.
+    """
+
+    def __init__(self, app):
+        self.app = app
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all responses."""
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
-        response: Response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-        return response
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + _SECURITY_HEADERS
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 # Charger l'env avant tout import interne qui lit os.getenv
 load_dotenv()
@@ -38,7 +56,8 @@ from app.api.notify import router as notify_router
 from app.api.password_reset import router as password_reset_router
 from app.api.preferences import router as preferences_router
 from app.api.profile import router as profile_router
-from app.oauth import router as oauth_router
+from app.cache_middleware import ResponseCacheMiddleware
+from app.oauth import router as oauth_router, close_http_client as close_oauth_http_client
 from app.db import Base, SessionLocal, engine
 from app.services.matching import cv_keywords, ensure_linkedin_sample, list_matches_for_user, cleanup_old_jobs
 from app.services.notifications import notify_all_users
@@ -140,12 +159,18 @@ frontend_url = os.getenv("FRONTEND_URL")
 if frontend_url:
     ALLOWED_ORIGINS.append(frontend_url)
 
+# Cache de réponses courte durée (ajouté avant CORS pour rester au plus
+# près des handlers : les entêtes CORS/sécurité sont recalculées par-dessus)
+app.add_middleware(ResponseCacheMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "X-Requested-With"],
+    # cache préflight côté navigateur, aligné sur les handlers d'erreur
+    max_age=600,
 )
 
 # Security headers middleware
@@ -166,6 +191,11 @@ app.include_router(notify_router)
 app.include_router(profile_router)
 
 
+@app.on_event("shutdown")
+async def shutdown_http_clients():
+    await close_oauth_http_client()
+
+
 @app.get("/health")
 def health():
     return {"ok": True}